@@ -1,21 +1,23 @@
-import copy
+import hashlib
 import os
+import shutil
 import tempfile
 import time
 import traceback
 from datetime import timedelta, datetime
 from pathlib import Path
-from typing import Tuple, Dict, Any, List
+from typing import Tuple, Dict, Any, List, Optional, Callable
 from threading import Event
 import iso639
 import psutil
 import srt
-from lxml import etree
 from dataclasses import dataclass
 from enum import Enum
 import queue
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
+from app import schemas
 from app.core.config import settings
 from app.core.context import MediaInfo
 from app.core.event import eventmanager, Event as MPEvent
@@ -23,9 +25,21 @@ from app.schemas import TransferInfo
 from app.schemas.types import NotificationType, EventType
 from app.log import logger
 from app.plugins import _PluginBase
-from app.utils.system import SystemUtils
+from plugins.autosubv2.artifacts import ArtifactStore
+from plugins.autosubv2.asr.calibration import calibrate, cpu_signature
+from plugins.autosubv2.asr.model_pool import ModelKey, whisper_model_pool
+from plugins.autosubv2.asr.model_registry import ModelRegistry
+from plugins.autosubv2.asr.profiles import build_transcribe_options, get_profile
+from plugins.autosubv2.asr.worker import AsrWorker, WorkerCrashed
+from plugins.autosubv2.asr.word_merger import StreamingWordMerger
 from plugins.autosubv2.ffmpeg import Ffmpeg
+from plugins.autosubv2.ffmpeg.runner import ProcessCancelled
+from plugins.autosubv2.ffmpeg.scheduler import io_scheduler
+from plugins.autosubv2.ffmpeg.probe_cache import ProbeCache
 from plugins.autosubv2.translate.openai_translate import OpenAi
+from plugins.autosubv2.translate import protocol
+from plugins.autosubv2.translate.batcher import AdaptiveBatcher, context_bounds, estimate_tokens
+from plugins.autosubv2.translate.memory import TranslationMemory
 from plugins.autosubv2.translate.ollama_translate import Ollama
 
 
@@ -39,6 +53,11 @@ class TaskSource(Enum):
     EVENT = "event"
 
 
+class TaskType(Enum):
+    FULL = "full"
+    RETRANSLATE = "retranslate"
+
+
 class TaskStatus(Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -55,6 +74,15 @@ class TaskItem:
     add_time: datetime
     status: TaskStatus = TaskStatus.PENDING
     complete_time: datetime = None
+    asr_profile: str = None
+    asr_rtf: float = None
+    detected_lang: str = None
+    detected_lang_prob: float = None
+    asr_model: str = None
+    force: bool = False
+    task_type: TaskType = TaskType.FULL
+    # 忽略已有字幕和转录结果，使用主模型重新识别
+    force_asr: bool = False
 
 
 class AutoSubv2(_PluginBase):
@@ -67,7 +95,7 @@ class AutoSubv2(_PluginBase):
     # 主题色
     plugin_color = "#2C4F7E"
     # 插件版本
-    plugin_version = "2.6"
+    plugin_version = "5.1"
     # 插件作者
     plugin_author = "liqman"
     # 作者主页
@@ -81,6 +109,8 @@ class AutoSubv2(_PluginBase):
 
     # 私有属性
     _tasks: Dict[str, TaskItem] = None
+    # 任务列表由消费线程、扫描线程和事件回调共同修改
+    _tasks_lock = threading.RLock()
     _task_queue = None
     _consumer_thread = None
     _current_processing_task = None
@@ -102,11 +132,49 @@ class AutoSubv2(_PluginBase):
     _batch_size = None
     _context_window = None
     _max_retries = None
+    _openai_concurrency = None
+    _ollama_concurrency = None
+    _stats_lock = threading.Lock()
+    _use_translation_memory = None
+    _translation_memory: TranslationMemory = None
+    _adaptive_batch = None
+    _batcher: AdaptiveBatcher = None
+    _batch_protocol = None
     _enable_merge = None
     _enable_asr = None
     _huggingface_proxy = None
     _faster_whisper_model_path = None
     _faster_whisper_model = None
+    _model_idle_timeout = None
+    _asr_workers = None
+    _asr_mode = None
+    _asr_batch_size = None
+    _asr_profile = None
+    _model_registry = None
+    _update_model = None
+    _run_calibration = None
+    _calibration: Dict[str, dict] = None
+    _calibrating = False
+    _speech_prefilter = None
+    _fallback_model = None
+    _backlog_threshold = None
+    _requeue_fallback = None
+    _asr_stats: Dict[str, dict] = None
+    _use_fallback = False
+    _asr_isolation = None
+    _asr_memory_limit = None
+    _transcript_cache = None
+    _artifacts: ArtifactStore = None
+    _retranslate = None
+    _probe_cache: ProbeCache = None
+    _ffmpeg: Ffmpeg = None
+    _io_device_limit = None
+    _io_path_limits = None
+    _io_readahead = None
+    _scan_workers = None
+    # 正在进行的媒体库扫描 {停止标志: 扫描线程}，停止服务时通知并等待其结束
+    _scans: Dict[threading.Event, threading.Thread] = None
+    _scans_lock = threading.Lock()
 
     def init_plugin(self, config=None):
         # 如果没有配置信息， 则不处理
@@ -119,6 +187,18 @@ class AutoSubv2(_PluginBase):
         self._run_now = config.get('run_now')
         if self._run_now:
             self._path_list = list(set(config.get('path_list').split('\n')))
+            self._retranslate = config.get('retranslate', False)
+            self._scan_workers = max(1, int(config.get('scan_workers'))) if config.get('scan_workers') else 8
+        self._artifacts = ArtifactStore(self.get_data_path() / "artifacts")
+        if not self._probe_cache:
+            self._probe_cache = ProbeCache(self.get_data_path() / "probe_cache.db")
+        # 停止服务时终止正在运行的 ffmpeg / ffprobe
+        self._ffmpeg = Ffmpeg(cancel_event=self._event)
+        self._io_device_limit = int(config.get('io_device_limit')) if config.get('io_device_limit') else 2
+        self._io_path_limits = config.get('io_path_limits') or ''
+        self._io_readahead = int(config.get('io_readahead')) if config.get('io_readahead') not in (None, '') else 16
+        io_scheduler.configure(self._io_device_limit, self.__parse_path_limits(self._io_path_limits),
+                               self._io_readahead)
         self._send_notify = config.get('send_notify', False)
         self._file_size = int(config.get('file_size')) if config.get('file_size') else 10
         # 字幕生成设置
@@ -129,6 +209,26 @@ class AutoSubv2(_PluginBase):
             self._faster_whisper_model_path = config.get('faster_whisper_model_path',
                                                          self.get_data_path() / "faster-whisper-models")
             self._huggingface_proxy = config.get('proxy', True)
+            self._model_registry = ModelRegistry(self._faster_whisper_model_path)
+            self._update_model = config.get('update_model', False)
+            self._run_calibration = config.get('run_calibration', False)
+            self._calibration = self.get_data("calibration") or {}
+            self._model_idle_timeout = int(config.get('model_idle_timeout')) \
+                if config.get('model_idle_timeout') not in (None, '') else 30
+            # 未配置时使用性能校准结果
+            self._asr_workers = max(1, int(config.get('asr_workers'))) if config.get('asr_workers') else None
+            self._asr_mode = config.get('asr_mode', 'sequential')
+            self._asr_profile = config.get('asr_profile', 'balanced')
+            self._speech_prefilter = config.get('speech_prefilter', False)
+            self._fallback_model = config.get('fallback_model')
+            self._backlog_threshold = float(config.get('backlog_threshold')) \
+                if config.get('backlog_threshold') else 12
+            self._requeue_fallback = config.get('requeue_fallback', False)
+            self._asr_stats = self.get_data("asr_stats") or {}
+            self._asr_batch_size = max(1, int(config.get('asr_batch_size'))) if config.get('asr_batch_size') else 8
+            self._asr_isolation = config.get('asr_isolation', True)
+            self._asr_memory_limit = int(config.get('asr_memory_limit')) if config.get('asr_memory_limit') else 0
+            self._transcript_cache = config.get('transcript_cache', True)
         self._translate_zh = config.get('translate_zh', False)
         if self._translate_zh:
             self._use_ollama = config.get('use_ollama', False) # 获取 Ollama 使用标志
@@ -184,7 +284,17 @@ class AutoSubv2(_PluginBase):
             self._batch_size = int(config.get('batch_size')) if config.get('batch_size') else 10
             self._context_window = int(config.get('context_window')) if config.get('context_window') else 5
             self._max_retries = int(config.get('max_retries')) if config.get('max_retries') else 3
+            self._openai_concurrency = max(1, int(config.get('openai_concurrency'))) \
+                if config.get('openai_concurrency') else 4
+            self._ollama_concurrency = max(1, int(config.get('ollama_concurrency'))) \
+                if config.get('ollama_concurrency') else 1
             self._enable_merge = config.get('enable_merge', False)
+            self._use_translation_memory = config.get('translation_memory', True)
+            self._adaptive_batch = config.get('adaptive_batch', True)
+            self._batch_protocol = config.get('batch_protocol') or protocol.NUMBERED
+            self._batcher = AdaptiveBatcher(self.get_data("translate_batching") or {})
+            if not self._translation_memory:
+                self._translation_memory = TranslationMemory(self.get_data_path() / "translation_memory.db")
 
         if self._clear_history:
             config['clear_history'] = False
@@ -195,6 +305,30 @@ class AutoSubv2(_PluginBase):
             # asr 配置检查
             if self._enable_asr and not self.__check_asr():
                 return
+            if self._enable_asr:
+                if self._update_model:
+                    config['update_model'] = False
+                    self.update_config(config)
+                # 预加载模型，并释放配置变更前的旧模型。模型下载也在此后台线程中完成，任务中不访问网络
+                whisper_model_pool.set_idle_timeout(self._model_idle_timeout * 60)
+                AsrWorker.set_memory_limit(self._asr_memory_limit)
+                whisper_model_pool.retain_only([self.__whisper_model_key(), self.__whisper_model_key(chunked=True)])
+                force_download = self._update_model
+                loader = lambda key: self.__prepare_whisper_model(key, force=force_download)
+                if force_download:
+                    # 更新模型后需重新加载，模型正在使用时推迟到任务结束后更新
+                    whisper_model_pool.refresh(self.__whisper_model_key(), loader)
+                else:
+                    whisper_model_pool.preload(self.__whisper_model_key(), loader)
+                if self._run_calibration:
+                    config['run_calibration'] = False
+                    self.update_config(config)
+                    self.__start_calibration()
+                # 备用模型只在后台提前下载，积压时才加载
+                if self._fallback_model and self._fallback_model != self._faster_whisper_model:
+                    threading.Thread(target=self.__download_fallback_model, daemon=True).start()
+            else:
+                whisper_model_pool.clear()
 
             if not self._running:
                 self._task_queue = queue.Queue()
@@ -202,13 +336,25 @@ class AutoSubv2(_PluginBase):
                 self._consumer_thread.start()
                 logger.info("任务队列和消费者线程已启动")
                 self._running = True
+                self.__requeue_interrupted_tasks()
+
+            if self._enable_asr and self._requeue_fallback:
+                config['requeue_fallback'] = False
+                self.update_config(config)
+                self.__requeue_fallback_tasks()
 
             if self._run_now:
                 config['run_now'] = False
+                config['retranslate'] = False
                 self.update_config(config)
-                logger.info("立即运行一次")
-                self._run_at_once(path_list=self._path_list)
+                logger.info("立即运行一次" + ("，仅重新翻译" if self._retranslate else ""))
+                # 扫描媒体库在后台进行，不阻塞插件初始化
+                self.__start_scan(self._path_list,
+                                  TaskType.RETRANSLATE if self._retranslate else TaskType.FULL)
+
+            threading.Thread(target=self.__prune_artifacts, daemon=True).start()
         else:
+            whisper_model_pool.clear()
             self.stop_service()
 
     def load_tasks(self) -> Dict[str, TaskItem]:
@@ -224,6 +370,14 @@ class AutoSubv2(_PluginBase):
                     status=TaskStatus(task_dict["status"]),
                     complete_time=datetime.fromisoformat(task_dict["complete_time"])
                     if task_dict.get("complete_time") else None,
+                    asr_profile=task_dict.get("asr_profile"),
+                    asr_rtf=task_dict.get("asr_rtf"),
+                    detected_lang=task_dict.get("detected_lang"),
+                    detected_lang_prob=task_dict.get("detected_lang_prob"),
+                    asr_model=task_dict.get("asr_model"),
+                    force=task_dict.get("force", False),
+                    task_type=TaskType(task_dict.get("task_type", TaskType.FULL.value)),
+                    force_asr=task_dict.get("force_asr", False),
                 )
                 tasks[task_id] = task
             except Exception as e:
@@ -239,40 +393,92 @@ class AutoSubv2(_PluginBase):
             "add_time": task.add_time.isoformat() if task.add_time else None,
             "status": task.status.value,
             "complete_time": task.complete_time.isoformat() if task.complete_time else None,
+            "asr_profile": task.asr_profile,
+            "asr_rtf": task.asr_rtf,
+            "detected_lang": task.detected_lang,
+            "detected_lang_prob": task.detected_lang_prob,
+            "asr_model": task.asr_model,
+            "force": task.force,
+            "task_type": task.task_type.value,
+            "force_asr": task.force_asr,
         }
 
     def save_tasks(self):
-        tasks_dict = {task_id: self._serialize_task(task) for task_id, task in self._tasks.items()}
-        self.save_data("tasks", tasks_dict)
-
-    def add_task(self, video_file: str, source: TaskSource):
+        # 持锁保存，避免较旧的快照覆盖较新的
+        with self._tasks_lock:
+            tasks_dict = {task_id: self._serialize_task(task) for task_id, task in self._tasks.items()}
+            self.save_data("tasks", tasks_dict)
+
+    def __update_task(self, task: TaskItem):
+        with self._tasks_lock:
+            self._tasks[task.task_id] = task
+            self.save_tasks()
+
+    def add_task(self, video_file: str, source: TaskSource, force: bool = False,
+                 task_type: TaskType = TaskType.FULL, force_asr: bool = False):
         """
         添加新任务到队列和任务列表中，若任务已存在则跳过。
         :param video_file: 视频文件路径
         :param source: 任务来源（手动/事件）
+        :param force: 目标字幕已存在时是否仍然处理
+        :param task_type: 任务类型（完整处理/仅重新翻译）
+        :param force_asr: 是否忽略已有字幕和转录结果，使用主模型重新识别
         """
         task = TaskItem(
             task_id=str(uuid4()),
             video_file=video_file,
             source=source,
-            add_time=datetime.now()
+            add_time=datetime.now(),
+            force=force,
+            task_type=task_type,
+            force_asr=force_asr
         )
 
-        if self.__is_duplicate_task(task.video_file):
-            logger.info(f"任务已存在，跳过添加：{video_file}")
-            return False
-
-        self._task_queue.put(task)
-        self._tasks[task.task_id] = task
-        self.save_tasks()
+        with self._tasks_lock:
+            if self.__is_duplicate_task(task.video_file):
+                logger.info(f"任务已存在，跳过添加：{video_file}")
+                return False
+            self._task_queue.put(task)
+            self.__update_task(task)
         logger.info(f"加入任务队列: {video_file}")
         return True
 
+    def __requeue_interrupted_tasks(self):
+        """
+        重新排队上次异常退出时未完成的任务，语音识别会从断点继续
+        """
+        with self._tasks_lock:
+            for task in sorted(self._tasks.values(), key=lambda x: x.add_time):
+                if task.status in [TaskStatus.PENDING, TaskStatus.IN_PROGRESS]:
+                    logger.info(f"恢复未完成的任务：{task.video_file}")
+                    task.status = TaskStatus.PENDING
+                    self._task_queue.put(task)
+            self.save_tasks()
+
+    def __requeue_fallback_tasks(self):
+        """
+        使用主模型重新处理由备用模型生成字幕的任务
+        """
+        # 同一视频以最近一次完成的完整处理任务为准，使用已有字幕完成的任务没有识别模型，无需重新处理
+        latest = {}
+        with self._tasks_lock:
+            tasks = sorted(self._tasks.values(), key=lambda x: x.add_time)
+        for task in tasks:
+            if task.status == TaskStatus.COMPLETED and task.task_type == TaskType.FULL:
+                latest[task.video_file] = task.asr_model
+        count = 0
+        for video_file, asr_model in latest.items():
+            if asr_model and asr_model != self._faster_whisper_model:
+                if self.add_task(video_file, TaskSource.MANUAL, force=True, force_asr=True):
+                    count += 1
+        logger.info(f"已重新加入 {count} 个由备用模型生成字幕的任务")
+
     def clear_tasks(self):
-        self._tasks = {task_id: task for task_id, task in self._tasks.items() if task.status in [
-            TaskStatus.PENDING, TaskStatus.IN_PROGRESS
-        ]}
-        self.save_tasks()
+        with self._tasks_lock:
+            self._tasks = {task_id: task for task_id, task in self._tasks.items() if task.status in [
+                TaskStatus.PENDING, TaskStatus.IN_PROGRESS
+            ]}
+            self.save_tasks()
         logger.info("插件历史任务已清除")
 
     def __is_duplicate_task(self, video_file: str) -> bool:
@@ -294,12 +500,11 @@ class AutoSubv2(_PluginBase):
                 self._current_processing_task = task
                 logger.info(f"开始处理任务 {task.task_id}: {task.video_file}")
                 task.status = TaskStatus.IN_PROGRESS
-                self._tasks[task.task_id] = task
-                self.save_tasks()
-                task.status = self.__process_autosub(task.video_file)
+                self.__update_task(task)
+                task.status = self.__process_autosub(task.video_file, force=task.force, task_type=task.task_type,
+                                                     force_asr=task.force_asr)
                 task.complete_time = datetime.now()
-                self._tasks[task.task_id] = task
-                self.save_tasks()
+                self.__update_task(task)
                 self._task_queue.task_done()
                 self._current_processing_task = None
             except queue.Empty:
@@ -332,17 +537,138 @@ class AutoSubv2(_PluginBase):
             if os.path.splitext(file_path)[-1].lower() in settings.RMT_MEDIAEXT:
                 self.add_task(file_path, TaskSource.EVENT)
 
-    def _run_at_once(self, path_list: List[str]):
-        # 依次处理每个目录
+    def __start_scan(self, path_list: List[str], task_type: TaskType):
+        """
+        在后台线程扫描媒体库，登记停止标志，停止服务时通知扫描结束
+        """
+        stop = threading.Event()
+        thread = threading.Thread(target=self._run_at_once, daemon=True,
+                                  kwargs={"path_list": path_list, "task_type": task_type, "stop": stop})
+        with self._scans_lock:
+            if self._scans is None:
+                self._scans = {}
+            self._scans[stop] = thread
+        thread.start()
+
+    def __stop_scans(self) -> List[threading.Thread]:
+        """
+        通知正在进行的扫描停止
+        :return: 扫描线程，调用方等待其结束
+        """
+        with self._scans_lock:
+            scans = dict(self._scans or {})
+        for stop in scans:
+            stop.set()
+        return list(scans.values())
+
+    def _run_at_once(self, path_list: List[str], task_type: TaskType = TaskType.FULL,
+                     stop: Optional[threading.Event] = None):
+        stop = stop or threading.Event()
+        try:
+            self.__scan_library(path_list, task_type, stop)
+        finally:
+            with self._scans_lock:
+                if self._scans:
+                    self._scans.pop(stop, None)
+
+    def __scan_library(self, path_list: List[str], task_type: TaskType, stop: threading.Event):
+        """
+        扫描目录和文件，需要处理的加入任务队列
+        :param stop: 停止标志，置位后不再探测文件和加入任务
+        """
+        def stopped() -> bool:
+            return stop.is_set() or self._event.is_set()
+
+        video_files = []
         for path in path_list:
             if not os.path.exists(path) or not os.path.isabs(path):
                 logger.warn(f"目录/文件无效，不进行处理:{path}")
                 continue
             if os.path.isdir(path):
-                for video_file in self.__get_library_files(path):
-                    self.add_task(video_file, TaskSource.MANUAL)
+                video_files.extend(self.__get_library_files(path))
             elif os.path.splitext(path)[-1].lower() in settings.RMT_MEDIAEXT:
-                self.add_task(path, TaskSource.MANUAL)
+                video_files.append(path)
+        # 仅重新翻译的任务需要覆盖已有字幕，不做筛选
+        if task_type == TaskType.RETRANSLATE:
+            for video_file in video_files:
+                if stopped():
+                    logger.info(f"服务已停止，扫描中止")
+                    return
+                self.add_task(video_file, TaskSource.MANUAL, task_type=task_type)
+            return
+
+        # 并发探测所有文件，只有需要处理的文件才加入任务队列
+        start = time.time()
+        logger.info(f"开始扫描 {len(video_files)} 个文件，并发数 {self._scan_workers} ...")
+        queued = 0
+        skipped = {}
+        executor = ThreadPoolExecutor(max_workers=self._scan_workers, thread_name_prefix="autosub-scan")
+        try:
+            for video_file, reason in executor.map(lambda file: self.__scan_file(file, stopped), video_files):
+                if stopped():
+                    logger.info(f"服务已停止，扫描中止：已加入队列 {queued} 个")
+                    return
+                if reason:
+                    skipped[reason] = skipped.get(reason, 0) + 1
+                    continue
+                if self.add_task(video_file, TaskSource.MANUAL, task_type=task_type):
+                    queued += 1
+        finally:
+            # 停止时取消尚未开始的探测，正在运行的 ffprobe 随插件停止事件终止
+            executor.shutdown(wait=True, cancel_futures=True)
+        probe_stats = self._probe_cache.stats()
+        logger.info(f"扫描完成：共 {len(video_files)} 个文件，加入队列 {queued} 个，跳过 {skipped}，"
+                    f"耗时 {round(time.time() - start, 2)}秒，元数据缓存命中率 {probe_stats['hit_rate']}%")
+
+    def __scan_file(self, video_file: str, stopped: Callable[[], bool]) -> Tuple[str, Optional[str]]:
+        """
+        扫描单个文件，判断是否需要生成字幕
+        :param stopped: 扫描是否已停止
+        :return: (文件路径, 跳过原因)，需要处理时跳过原因为None
+        """
+        if stopped():
+            return video_file, "服务停止"
+        try:
+            if os.path.getsize(video_file) < self._file_size * 1024 * 1024:
+                return video_file, "文件过小"
+            video_meta = self.__get_video_metadata(video_file)
+            if not video_meta:
+                return video_file, "获取元数据失败"
+            logger.debug(f"{video_file}：{self.__summarize_media(video_meta)}")
+            if self.__has_chinese_subtitle(video_meta):
+                return video_file, "已有内嵌中文字幕"
+            if self.__target_subtitle_exists(video_file):
+                return video_file, "目标字幕已存在"
+        except ProcessCancelled:
+            return video_file, "服务停止"
+        except Exception as e:
+            logger.warn(f"扫描文件失败：{video_file}，{e}")
+            return video_file, "扫描失败"
+        return video_file, None
+
+    @staticmethod
+    def __has_chinese_subtitle(video_meta: dict) -> bool:
+        zh_langs = ['zh', 'chi', 'zho', 'zh-CN', 'chs', 'zh-Hans', 'zhong', 'simp', 'cn']
+        for stream in video_meta.get('streams', []):
+            if stream.get('codec_type') != 'subtitle' or stream.get('disposition', {}).get('forced'):
+                continue
+            if stream.get('tags', {}).get('language') in zh_langs:
+                return True
+        return False
+
+    @staticmethod
+    def __summarize_media(video_meta: dict) -> str:
+        """
+        媒体信息摘要：时长、音轨和字幕的语言及编码
+        """
+        streams = video_meta.get('streams', [])
+
+        def describe(codec_type):
+            return [f"{stream.get('tags', {}).get('language', 'und')}/{stream.get('codec_name')}"
+                    for stream in streams if stream.get('codec_type') == codec_type]
+
+        duration = video_meta.get('format', {}).get('duration')
+        return f"时长 {round(float(duration)) if duration else '-'}秒，音轨 {describe('audio')}，字幕 {describe('subtitle')}"
 
     def __check_asr(self):
         if not self._faster_whisper_model_path or not self._faster_whisper_model:
@@ -358,7 +684,7 @@ class AutoSubv2(_PluginBase):
             return False
         return True
 
-    def __process_autosub(self, video_file) -> TaskStatus:
+    def __process_autosub(self, video_file, force=False, task_type=TaskType.FULL, force_asr=False) -> TaskStatus:
         if not video_file:
             return TaskStatus.FAILED
         # 如果文件大小小于指定大小， 则不处理
@@ -371,12 +697,18 @@ class AutoSubv2(_PluginBase):
 
         try:
             logger.info(f"开始处理文件：{video_file} ...")
+            retranslate = task_type == TaskType.RETRANSLATE
+            if retranslate and not self._translate_zh:
+                logger.warn(f"未开启翻译，无法重新翻译")
+                return TaskStatus.IGNORED
             # 判断目的字幕（和内嵌）是否已存在
-            if self.__target_subtitle_exists(video_file):
+            if not force and not retranslate and self.__target_subtitle_exists(video_file):
                 logger.warn(f"字幕文件已经存在，不进行处理")
                 return TaskStatus.IGNORED
-            # 生成字幕
-            ret, lang, gen_sub_path = self.__generate_subtitle(video_file, file_path, self._enable_asr)
+            # 生成字幕，仅重新翻译时只使用已有字幕和转录结果，不进行语音识别
+            ret, lang, gen_sub_path = self.__generate_subtitle(video_file, file_path,
+                                                               self._enable_asr and not retranslate,
+                                                               force_asr=force_asr and not retranslate)
             if not ret:
                 message = f" 媒体: {file_name}\n 生成字幕失败，跳过后续处理"
                 if self._send_notify:
@@ -386,7 +718,8 @@ class AutoSubv2(_PluginBase):
             if self._translate_zh:
                 # 翻译字幕
                 logger.info(f"开始翻译字幕为中文 ...")
-                self.__translate_zh_subtitle(lang, gen_sub_path, f"{file_path}.zh.机翻.srt")
+                self.__translate_zh_subtitle(lang, gen_sub_path, f"{file_path}.zh.机翻.srt",
+                                             reuse_translation=not retranslate)
                 logger.info(f"翻译字幕完成：{file_name}.zh.机翻.srt")
 
             end_time = time.time()
@@ -398,7 +731,7 @@ class AutoSubv2(_PluginBase):
             if self._send_notify:
                 self.post_message(mtype=NotificationType.Plugin, title="【自动字幕生成】", text=message)
             return TaskStatus.COMPLETED
-        except UserInterruptException:
+        except (UserInterruptException, ProcessCancelled):
             logger.info(f"用户中断当前任务：{video_file}")
             return TaskStatus.FAILED
         except Exception as e:
@@ -411,127 +744,388 @@ class AutoSubv2(_PluginBase):
             logger.error(traceback.format_exc())
             return TaskStatus.FAILED
 
-    def __do_speech_recognition(self, audio_lang, audio_file):
+    def __whisper_model_key(self, model: str = None, chunked: bool = False) -> ModelKey:
         """
-        语音识别, 生成字幕
-        :param audio_lang:
-        :param audio_file:
-        :return:
+        当前配置对应的模型池键。档位未指定计算精度时，使用性能校准结果。
+        只有分段并行转录才按并行数拆分线程，顺序推理、批量推理和语言检测使用单个 worker 占满全部核心
+        :param model: 模型名称，默认为配置的模型
+        :param chunked: 是否用于分段并行转录，见 __use_chunked
         """
-        lang = audio_lang
-        model = None # 初始化为 None
-        try:
-            from faster_whisper import WhisperModel, download_model
+        model = model or self._faster_whisper_model
+        calibration = self.__calibration_result(model)
+        compute_type = get_profile(self._asr_profile)["compute_type"]
+        if compute_type == "auto":
+            compute_type = calibration["best"]["compute_type"] if calibration else "int8"
+        workers = self.__chunk_workers(model) if chunked else 1
+        cpu_threads = max(1, psutil.cpu_count(logical=False) // workers)
+        if calibration:
+            for result in calibration["results"]:
+                if result["compute_type"] == compute_type and result["num_workers"] == workers:
+                    cpu_threads = result["cpu_threads"]
+                    break
+        return ModelKey(model=model,
+                        compute_type=compute_type,
+                        cpu_threads=cpu_threads,
+                        num_workers=workers,
+                        isolated=self._asr_isolation)
+
+    def __chunk_workers(self, model: str = None) -> int:
+        """
+        分段并行转录的并行数：手动配置优先，否则使用性能校准结果
+        """
+        if self._asr_workers:
+            return self._asr_workers
+        calibration = self.__calibration_result(model or self._faster_whisper_model)
+        return calibration["best"]["num_workers"] if calibration else 1
 
-            # 设置缓存目录, 防止缓存同目录出现 cross-device 错误
-            cache_dir = os.path.join(self._faster_whisper_model_path, "cache")
-            if not os.path.exists(cache_dir):
-                logger.info(f"创建faster-whisper模型缓存目录：{cache_dir}")
-                os.makedirs(cache_dir, exist_ok=True) # 使用 os.makedirs 确保创建所有缺失的父目录
-            os.environ["HF_HUB_CACHE"] = cache_dir
-
-            if self._huggingface_proxy:
-                # 检查 settings.PROXY 是否存在且包含 'http' / 'https' 键
-                if settings.PROXY and isinstance(settings.PROXY, dict):
-                    if 'http' in settings.PROXY and settings.PROXY['http']:
-                        os.environ["HTTP_PROXY"] = settings.PROXY['http']
-                        logger.info(f"设置 HTTP_PROXY: {settings.PROXY['http']}")
-                    if 'https' in settings.PROXY and settings.PROXY['https']:
-                        os.environ["HTTPS_PROXY"] = settings.PROXY['https']
-                        logger.info(f"设置 HTTPS_PROXY: {settings.PROXY['https']}")
-                else:
-                    logger.warn("配置中启用HuggingFace代理，但settings.PROXY未配置或格式不正确。将跳过设置代理环境变量。")
-                    # 如果没有有效的代理配置，可以考虑禁用 _huggingface_proxy 或者给出更明确的提示
-                    # self._huggingface_proxy = False # 或者这样，避免后续尝试使用不存在的代理
-
-            logger.info(f"正在下载或加载 faster-whisper 模型 '{self._faster_whisper_model}' 到 '{cache_dir}' ...")
-            # 尝试下载模型
-            model_path = download_model(self._faster_whisper_model, local_files_only=False, cache_dir=cache_dir)
-            if not model_path:
-                logger.error(f"无法下载或找到 faster-whisper 模型 '{self._faster_whisper_model}'。请检查网络或模型名称。")
-                return False, None
-
-            logger.info(f"faster-whisper 模型已准备就绪: {model_path}")
-            # 初始化 WhisperModel
-            model = WhisperModel(
-                model_path, # 确保这里是有效的模型路径
-                device="cpu", # 尝试使用 "cuda" 如果有GPU，否则保持 "cpu"
-                compute_type="int8", # 尝试 "int8_float16" 或 "float16" 如果 int8 有问题
-                cpu_threads=psutil.cpu_count(logical=False)
-            )
-            logger.info(f"faster-whisper 模型初始化完成。")
+    def __use_chunked(self, duration: float, model: str = None) -> bool:
+        """
+        是否分段并行转录：顺序推理、并行数大于1且音频超过10分钟。批量推理由 pipeline 自行批处理
+        """
+        from plugins.autosubv2.asr.chunked import CHUNK_MIN_SECONDS
 
-            logger.info(f"开始转录音频文件 '{audio_file}'，语言设置为 '{lang}' ...")
-            segments, info = model.transcribe(audio_file,
-                                              language=lang if lang != 'auto' else None,
-                                              word_timestamps=True,
-                                              vad_filter=True,
-                                              temperature=0,
-                                              beam_size=5)
+        return self._asr_mode != 'batched' and self.__chunk_workers(model) > 1 and duration > CHUNK_MIN_SECONDS
+
+    def __calibration_result(self, model: str) -> Optional[dict]:
+        """
+        当前CPU和模型的性能校准结果
+        """
+        if not self._calibration:
+            return None
+        return self._calibration.get(f"{cpu_signature()}|{model}")
 
-            if info is None: # 检查 info 是否为 None
-                logger.error(f"faster-whisper 转录失败，未能获取到语言信息。")
-                return False, None
+    def __select_asr_model(self) -> str:
+        """
+        根据任务积压情况选择模型：预计清空队列的时间超过阈值时切换到备用模型，积压降到阈值一半以下时切回
+        """
+        if not self._fallback_model or self._fallback_model == self._faster_whisper_model:
+            return self._faster_whisper_model
+        stats = self._asr_stats.get(self._faster_whisper_model)
+        if not stats:
+            return self._faster_whisper_model
+        # 队列中的任务 + 当前任务
+        pending = self._task_queue.qsize() + 1 if self._task_queue else 1
+        drain_hours = pending * stats["duration"] * stats["rtf"] / 3600
+        if not self._use_fallback and drain_hours > self._backlog_threshold:
+            self._use_fallback = True
+            logger.info(f"任务积压：{pending} 个任务预计需要 {round(drain_hours, 1)} 小时，切换到备用模型 {self._fallback_model}")
+        elif self._use_fallback and drain_hours < self._backlog_threshold / 2:
+            self._use_fallback = False
+            logger.info(f"任务积压已缓解：预计 {round(drain_hours, 1)} 小时，切换回模型 {self._faster_whisper_model}")
+        return self._fallback_model if self._use_fallback else self._faster_whisper_model
+
+    def __record_asr_stats(self, model: str, duration: float, rtf: float):
+        """
+        记录模型的实时率和平均音频时长（指数滑动平均），用于估算积压耗时
+        """
+        stats = self._asr_stats.get(model)
+        if stats:
+            stats["rtf"] = round(stats["rtf"] * 0.7 + rtf * 0.3, 4)
+            stats["duration"] = round(stats["duration"] * 0.7 + duration * 0.3, 1)
+        else:
+            self._asr_stats[model] = {"rtf": rtf, "duration": round(duration, 1)}
+        self.save_data("asr_stats", self._asr_stats)
 
-            logger.info("Detected language '%s' with probability %f" % (info.language, info.language_probability))
+    def __download_fallback_model(self):
+        try:
+            if not self._model_registry.resolve(self._fallback_model):
+                self.__setup_huggingface_proxy()
+                self._model_registry.download(self._fallback_model)
+        except Exception as e:
+            logger.error(f"下载备用模型 {self._fallback_model} 失败：{e}")
 
-            if lang == 'auto':
-                lang = info.language
+    def __start_calibration(self):
+        """
+        在后台线程中执行性能校准
+        """
+        if self._calibrating:
+            logger.info(f"性能校准正在进行中")
+            return False
+        model_path = self._model_registry.resolve(self._faster_whisper_model) if self._model_registry else None
+        if not model_path:
+            logger.warn(f"模型 {self._faster_whisper_model} 尚未下载，无法进行性能校准")
+            return False
 
-            subs = []
-            # 注意：segments 可能是一个生成器，如果它在被遍历前就因为某种原因失败，也可能导致问题
-            # 最好在尝试遍历前检查其是否可用，或者依赖 try-except 捕获生成器内部的错误
+        def run():
+            self._calibrating = True
             try:
-                if lang in ['en', 'eng']:
-                    # 英文先生成单词级别字幕，再合并
-                    idx = 0
-                    for segment in segments: # 遍历生成器
-                        if self._event.is_set():
-                            logger.info(f"whisper音轨转录服务停止")
-                            raise UserInterruptException(f"用户中断当前任务")
-                        for word in segment.words:
-                            idx += 1
-                            subs.append(srt.Subtitle(index=idx,
-                                                     start=timedelta(seconds=word.start),
-                                                     end=timedelta(seconds=word.end),
-                                                     content=word.word))
-                    subs = self.__merge_srt(subs)
-                else:
-                    for i, segment in enumerate(segments): # 遍历生成器
-                        if self._event.is_set():
-                            logger.info(f"whisper音轨转录服务停止")
-                            raise UserInterruptException(f"用户中断当前任务")
-                        subs.append(srt.Subtitle(index=i,
-                                                 start=timedelta(seconds=segment.start),
-                                                 end=timedelta(seconds=segment.end),
-                                                 content=segment.text))
-            except Exception as segments_error:
-                logger.error(f"处理faster-whisper转录结果时发生错误: {segments_error}")
-                traceback.print_exc()
-                return False, None
-
-            self.__save_srt(f"{audio_file}.srt", subs)
-            logger.info(f"音轨转字幕完成")
-            return True, lang
+                logger.info(f"开始性能校准：{self._faster_whisper_model}")
+                result = calibrate(self._faster_whisper_model, model_path, should_stop=self._event.is_set)
+                if not result:
+                    logger.warn(f"性能校准未完成")
+                    return
+                self._calibration[f"{result['cpu']}|{result['model']}"] = result
+                self.save_data("calibration", self._calibration)
+                logger.info(f"性能校准完成，最快配置：{result['best']}")
+                # 使用新配置重新加载模型
+                whisper_model_pool.retain_only([self.__whisper_model_key(), self.__whisper_model_key(chunked=True)])
+            except Exception as e:
+                logger.error(f"性能校准失败：{e}")
+                logger.error(traceback.format_exc())
+            finally:
+                self._calibrating = False
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
+
+    def __prepare_whisper_model(self, key: ModelKey, force: bool = False):
+        """
+        下载（或更新）并加载模型，仅在后台预加载线程中调用
+        :param key: 模型池键
+        :param force: 是否重新下载
+        :return: WhisperModel
+        """
+        if force or not self._model_registry.resolve(key.model):
+            self.__setup_huggingface_proxy()
+            self._model_registry.download(key.model, force=force)
+        return self.__load_whisper_model(key)
+
+    def __setup_huggingface_proxy(self):
+        """
+        启用HuggingFace代理时，下载模型前按系统代理设置环境变量
+        """
+        if not self._huggingface_proxy:
+            return
+        # 检查 settings.PROXY 是否存在且包含 'http' / 'https' 键
+        if settings.PROXY and isinstance(settings.PROXY, dict):
+            if 'http' in settings.PROXY and settings.PROXY['http']:
+                os.environ["HTTP_PROXY"] = settings.PROXY['http']
+                logger.info(f"设置 HTTP_PROXY: {settings.PROXY['http']}")
+            if 'https' in settings.PROXY and settings.PROXY['https']:
+                os.environ["HTTPS_PROXY"] = settings.PROXY['https']
+                logger.info(f"设置 HTTPS_PROXY: {settings.PROXY['https']}")
+        else:
+            logger.warn("配置中启用HuggingFace代理，但settings.PROXY未配置或格式不正确。将跳过设置代理环境变量。")
+
+    def __load_whisper_model(self, key: ModelKey):
+        """
+        从本地模型仓库初始化 faster-whisper 模型，不访问网络
+        :param key: 模型池键
+        :return: LocalEngine 或 AsrWorker（独立进程）
+        """
+        from plugins.autosubv2.asr.engine import LocalEngine, load_model
+
+        model_path = self._model_registry.resolve(key.model)
+        if not model_path:
+            raise Exception(f"faster-whisper 模型 '{key.model}' 尚未下载完成，请等待后台下载或开启“下载/更新模型”")
+
+        logger.info(f"faster-whisper 模型已准备就绪: {model_path}")
+        if key.isolated:
+            return AsrWorker(model_path, key.compute_type, key.cpu_threads, key.num_workers)
+        return LocalEngine(load_model(model_path, key.compute_type, key.cpu_threads, key.num_workers))
+
+    def __do_speech_recognition(self, audio_lang, audio, asr_model=None, time_map=None, checkpoint_file=None):
+        """
+        语音识别, 生成字幕
+        :param audio_lang: 音频语言
+        :param audio: 16000hz float32 音频数据
+        :param asr_model: 使用的模型，默认为配置的模型
+        :param time_map: 时间戳映射函数，将转录时间映射回原始时间轴
+        :param checkpoint_file: 转录断点文件
+        :return: (是否成功, 字幕语言, 字幕列表)
+        """
+        lang = audio_lang
+        restarts = 0
+        try:
+            key = self.__whisper_model_key(asr_model, chunked=self.__use_chunked(len(audio) / 16000, asr_model))
+            while True:
+                try:
+                    with whisper_model_pool.acquire(key, self.__load_whisper_model) as engine:
+                        return self.__transcribe(engine, key, lang, audio, time_map=time_map,
+                                                 checkpoint_file=checkpoint_file)
+                except WorkerCrashed as e:
+                    if self._event.is_set():
+                        logger.info(f"whisper音轨转录服务停止")
+                        raise UserInterruptException(f"用户中断当前任务")
+                    # 已完成的段保存在断点中，重启识别进程后继续
+                    if restarts >= 2 or not checkpoint_file:
+                        raise
+                    restarts += 1
+                    logger.warn(f"{e}，重启语音识别进程后从断点继续（{restarts}/2）")
         except ImportError:
             logger.warn(f"faster-whisper 未安装，不进行处理。请运行 'pip install faster-whisper'。")
-            return False, None
+            return False, None, None
         except UserInterruptException:
             raise # 重新抛出用户中断异常
         except Exception as e:
             traceback.print_exc()
             logger.error(f"faster-whisper 处理异常：{e}")
-            return False, None
+            return False, None, None
+
+    def __transcribe(self, engine, key: ModelKey, lang, audio, time_map=None, checkpoint_file=None):
+        """
+        使用已加载的模型转录音频
+        :param engine: LocalEngine 或 AsrWorker
+        :param key: 模型池键
+        :param lang: 音频语言
+        :param audio: 16000hz float32 音频数据
+        :param time_map: 时间戳映射函数
+        :param checkpoint_file: 转录断点文件，存在时从断点继续转录
+        :return: (是否成功, 字幕语言, 字幕列表)
+        """
+        from plugins.autosubv2.asr.checkpoint import TranscriptCheckpoint, shift_segments
+
+        if not time_map:
+            time_map = lambda t: t
+        duration = len(audio) / 16000
+        transcribe_start = time.time()
+
+        checkpoint = TranscriptCheckpoint(checkpoint_file).load() if checkpoint_file else None
+        offset = 0
+        if checkpoint and checkpoint.segments:
+            lang = checkpoint.lang or lang
+            offset = checkpoint.resume_at
+            logger.info(f"从断点继续转录：已完成 {len(checkpoint.segments)} 段，从 {round(offset, 2)}秒 开始")
+        remaining = audio[int(offset * 16000):]
+
+        # 音轨未标注语言时，先在多个语音片段上快速检测语言，再按确定的语言转录
+        if lang == 'auto':
+            lang = self.__detect_language(engine, audio)
+        logger.info(f"开始转录音频，时长 {round(len(remaining) / 16000, 2)}秒，语言设置为 '{lang}' ...")
+        # 仅英文需要单词级时间戳用于整句合并，语言未知时保留
+        word_timestamps = lang in ['en', 'eng', 'auto']
+        _, transcribe_args = build_transcribe_options(self._asr_profile, word_timestamps=word_timestamps)
+        logger.info(f"识别档位：{self._asr_profile}，单词级时间戳：{word_timestamps}")
+        if len(remaining) < 16000:
+            # 断点已覆盖全部音频
+            segments, info = [], None
+        else:
+            mode, segments, info = engine.transcribe(remaining,
+                                                     language=lang if lang != 'auto' else None,
+                                                     mode=self._asr_mode,
+                                                     workers=key.num_workers,
+                                                     batch_size=self._asr_batch_size,
+                                                     should_stop=self._event.is_set,
+                                                     **transcribe_args)
+            if mode == 'batched':
+                logger.info(f"使用批量推理，批大小 {self._asr_batch_size}")
+            elif mode == 'chunked':
+                logger.info(f"使用分段并行转录，并行数 {key.num_workers}")
+            elif self._asr_mode == 'batched':
+                logger.warn(f"当前 faster-whisper 版本不支持批量推理，请升级到 1.1.0 以上版本，使用顺序推理")
+
+        if info is not None:
+            logger.info("Detected language '%s' with probability %f" % info)
+            if lang == 'auto':
+                lang = info[0]
+        if lang == 'auto': # 未能获取到语言信息
+            if hasattr(segments, "close"):
+                segments.close()
+            logger.error(f"faster-whisper 转录失败，未能获取到语言信息。")
+            return False, None, None
+
+        def iter_segments():
+            """
+            先返回断点中已完成的段，再返回新转录的段，新段同时写入断点
+            """
+            if not checkpoint:
+                yield from shift_segments(segments, offset)
+                return
+            yield from list(checkpoint.segments)
+            checkpoint.start(lang)
+            for new_segment in shift_segments(segments, offset):
+                checkpoint.append(new_segment)
+                yield new_segment
+
+        subs = []
+        # 注意：segments 可能是一个生成器，如果它在被遍历前就因为某种原因失败，也可能导致问题
+        # 最好在尝试遍历前检查其是否可用，或者依赖 try-except 捕获生成器内部的错误
+        try:
+            if lang in ['en', 'eng']:
+                # 英文按单词流式合并为整句
+                merger = StreamingWordMerger()
+                for segment in iter_segments(): # 遍历生成器
+                    if self._event.is_set():
+                        logger.info(f"whisper音轨转录服务停止")
+                        raise UserInterruptException(f"用户中断当前任务")
+                    for word in segment.words:
+                        merger.feed(time_map(word.start), time_map(word.end), word.word)
+                subs = merger.to_subtitles()
+            else:
+                for i, segment in enumerate(iter_segments()): # 遍历生成器
+                    if self._event.is_set():
+                        logger.info(f"whisper音轨转录服务停止")
+                        raise UserInterruptException(f"用户中断当前任务")
+                    subs.append(srt.Subtitle(index=i,
+                                             start=timedelta(seconds=time_map(segment.start)),
+                                             end=timedelta(seconds=time_map(segment.end)),
+                                             content=segment.text))
+        except UserInterruptException:
+            logger.info(f"转录断点已保存，重新执行任务时将继续转录")
+            raise
+        except WorkerCrashed:
+            raise
+        except Exception as segments_error:
+            logger.error(f"处理faster-whisper转录结果时发生错误: {segments_error}")
+            traceback.print_exc()
+            return False, None, None
+        finally:
+            if hasattr(segments, "close"):
+                segments.close()
+            if checkpoint:
+                checkpoint.close()
+
+        if checkpoint:
+            checkpoint.remove()
+        elapsed = time.time() - transcribe_start
+        rtf = round(elapsed / max(duration - offset, 1), 3)
+        logger.info(f"音轨转字幕完成，转录耗时 {round(elapsed, 2)}秒，实时率(RTF) {rtf}")
+        if isinstance(engine, AsrWorker):
+            logger.info(f"语音识别进程内存占用 {engine.memory() // 1024 // 1024}MB")
+        if duration - offset > 60:
+            self.__record_asr_stats(key.model, duration, rtf)
+        if self._current_processing_task:
+            self._current_processing_task.asr_profile = self._asr_profile
+            self._current_processing_task.asr_rtf = rtf
+            self._current_processing_task.asr_model = key.model
+        return True, lang, subs
+
+    def __detect_language(self, engine, audio) -> str:
+        """
+        取样检测音频语言
+        :return: 语言，检测失败时返回 auto 交由转录时检测
+        """
+        try:
+            start = time.time()
+            result = engine.detect_language(audio)
+        except WorkerCrashed:
+            raise
+        except Exception as e:
+            logger.warn(f"语言检测失败，转录时自动检测：{e}")
+            return 'auto'
+        if not result:
+            return 'auto'
+        lang, prob, scores = result
+        logger.info(f"语言检测结果：{lang}，置信度 {round(prob, 3)}，候选 {scores}，耗时 {round(time.time() - start, 2)}秒")
+        if self._current_processing_task:
+            self._current_processing_task.detected_lang = lang
+            self._current_processing_task.detected_lang_prob = round(prob, 3)
+        return lang
+
+    def __detect_audio_language(self, audio, asr_model) -> str:
+        """
+        在语音识别之前检测音频语言，使用与转录相同的模型池键，模型加载后由转录继续使用
+        :return: 语言，检测失败时返回 auto
+        """
+        try:
+            key = self.__whisper_model_key(asr_model, chunked=self.__use_chunked(len(audio) / 16000, asr_model))
+            with whisper_model_pool.acquire(key, self.__load_whisper_model) as engine:
+                return self.__detect_language(engine, audio)
+        except Exception as e:
+            logger.warn(f"语言检测失败，转录时自动检测：{e}")
+            return 'auto'
 
-    def __generate_subtitle(self, video_file, subtitle_file, enable_asr=True):
+    def __generate_subtitle(self, video_file, subtitle_file, enable_asr=True, force_asr=False):
         """
         生成字幕
         :param video_file: 视频文件
         :param subtitle_file: 字幕文件, 不包含后缀
+        :param enable_asr: 是否允许语音识别
+        :param force_asr: 忽略已有字幕和其他模型的转录结果，使用主模型重新识别并覆盖已生成的字幕
         :return: 生成成功返回True，字幕语言,字幕路径，否则返回False, None, None
         """
         # 获取文件元数据
-        video_meta = Ffmpeg().get_video_metadata(video_file)
+        video_meta = self.__get_video_metadata(video_file)
         if not video_meta:
             logger.error(f"获取视频文件元数据失败，跳过后续处理")
             return False, None, None
@@ -558,17 +1152,20 @@ class AutoSubv2(_PluginBase):
         if self._translate_preference == "origin_first":
             prefer_subtitle_langs = ['en', 'eng'] if audio_lang == 'auto' else [audio_lang,
                                                                                 iso639.to_iso639_1(audio_lang)]
-        # 获取外挂字幕
-        logger.info(f"使用 {prefer_subtitle_langs} 匹配已有外挂字幕文件 ...")
-        external_sub_exist, external_sub_lang, exist_sub_name = self.__external_subtitle_exists(video_file,
-                                                                                                prefer_subtitle_langs,
-                                                                                                only_srt=True,
-                                                                                                strict=strict)
-        # 获取内嵌字幕
-        logger.info(f"使用 {prefer_subtitle_langs} 匹配内嵌字幕文件 ...")
-        inner_sub_exist, subtitle_index, inner_sub_lang, = self.__get_video_prefer_subtitle(video_meta,
-                                                                                            prefer_subtitle_langs,
-                                                                                            strict=strict)
+        if force_asr:
+            # 同名的外挂字幕是上次识别生成的，不能作为字幕源
+            logger.info(f"使用主模型重新识别，忽略已有字幕")
+            external_sub_exist = inner_sub_exist = False
+            external_sub_lang = exist_sub_name = subtitle_index = inner_sub_lang = None
+        else:
+            # 获取外挂字幕
+            logger.info(f"使用 {prefer_subtitle_langs} 匹配已有外挂字幕文件 ...")
+            external_sub_exist, external_sub_lang, exist_sub_name = self.__external_subtitle_exists(
+                video_file, prefer_subtitle_langs, only_srt=True, strict=strict)
+            # 获取内嵌字幕
+            logger.info(f"使用 {prefer_subtitle_langs} 匹配内嵌字幕文件 ...")
+            inner_sub_exist, subtitle_index, inner_sub_lang, = self.__get_video_prefer_subtitle(
+                video_meta, prefer_subtitle_langs, strict=strict)
 
         # 优先返回符合语言要求的外部字幕
         def get_sub_path():
@@ -605,43 +1202,291 @@ class AutoSubv2(_PluginBase):
             inner_sub_lang = iso639.to_iso639_1(inner_sub_lang) \
                 if (inner_sub_lang and iso639.find(inner_sub_lang) and iso639.to_iso639_1(inner_sub_lang)) else 'und'
             extracted_sub_path = f"{subtitle_file}.{inner_sub_lang}.srt"
-            Ffmpeg().extract_subtitle_from_video(video_file, extracted_sub_path, subtitle_index)
+            cached_sub_path = self.__subtitle_artifact_path(video_file, subtitle_index)
+            if cached_sub_path.exists():
+                self._artifacts.touch(cached_sub_path)
+                logger.info(f"使用已提取的内嵌字幕")
+            else:
+                # 一次读取容器，提取全部文本字幕
+                subtitle_outputs = self.__missing_subtitle_outputs(video_file, video_meta)
+                subtitle_outputs.setdefault(subtitle_index, cached_sub_path)
+                duration = self.__media_duration(video_meta)
+                if not self._ffmpeg.extract_subtitles_from_video(video_file, subtitle_outputs, duration=duration):
+                    self.__discard_outputs(subtitle_outputs)
+                    self._ffmpeg.extract_subtitle_from_video(video_file, extracted_sub_path, subtitle_index,
+                                                             duration=duration)
+                    logger.info(f"提取字幕完成：{extracted_sub_path}")
+                    return True, inner_sub_lang, extracted_sub_path
+            shutil.copyfile(cached_sub_path, extracted_sub_path)
             logger.info(f"提取字幕完成：{extracted_sub_path}")
             return True, inner_sub_lang, extracted_sub_path
         # 使用asr音轨识别字幕
         if audio_lang != 'auto':
             audio_lang = iso639.to_iso639_1(audio_lang)
 
+        # 相同输入和识别参数已转录过时直接使用，重新识别时只使用主模型的结果
+        if force_asr:
+            asr_model = self._faster_whisper_model
+        else:
+            asr_model = self.__select_asr_model() if self._faster_whisper_model else None
+        if asr_model:
+            transcript = self.__load_transcript_artifact(video_file, audio_index, asr_model)
+            if transcript:
+                lang, subs = transcript
+                self.__save_srt(f"{subtitle_file}.{lang}.srt", subs)
+                logger.info(f"保存字幕文件：{subtitle_file}.{lang}.srt")
+                return True, lang, Path(f"{subtitle_file}.{lang}.srt")
+
         if not enable_asr:
             logger.info(f"未开启语音识别，且无已有字幕文件，跳过后续处理")
             return False, None, None
 
-        # 清理异常退出的临时文件
+        # 清理旧版本异常退出遗留的临时文件
         tempdir = tempfile.gettempdir()
         for file in os.listdir(tempdir):
             if file.startswith('autosub-'):
                 os.remove(os.path.join(tempdir, file))
 
-        with tempfile.NamedTemporaryFile(prefix='autosub-', suffix='.wav', delete=True) as audio_file:
-            # 提取音频
-            logger.info(f"正在提取音频：{audio_file.name} ...")
-            Ffmpeg().extract_wav_from_video(video_file, audio_file.name, audio_index)
-            logger.info(f"提取音频完成：{audio_file.name}")
-
-            # 生成字幕
-            logger.info(f"开始生成字幕, 语言 {audio_lang} ...")
-            ret, lang = self.__do_speech_recognition(audio_lang, audio_file.name)
-            if ret:
-                logger.info(f"生成字幕成功，原始语言：{lang}")
-                # 复制字幕文件
-                SystemUtils.copy(Path(f"{audio_file.name}.srt"), Path(f"{subtitle_file}.{lang}.srt"))
-                logger.info(f"复制字幕文件：{subtitle_file}.{lang}.srt")
-                # 删除临时文件
-                os.remove(f"{audio_file.name}.srt")
-                return ret, lang, Path(f"{subtitle_file}.{lang}.srt")
-            else:
-                logger.error(f"生成字幕失败")
+        # 提取音频，直接解码到内存，文本字幕在同一次读取中一并提取
+        logger.info(f"正在提取音频：{video_file} ...")
+        subtitle_outputs = self.__missing_subtitle_outputs(video_file, video_meta)
+        duration = self.__media_duration(video_meta)
+        audio = self._ffmpeg.read_pcm_from_video(video_file, audio_index, subtitle_outputs=subtitle_outputs,
+                                                 duration=duration)
+        if audio is None and subtitle_outputs:
+            # 部分字幕格式无法转换为srt时仅提取音频
+            self.__discard_outputs(subtitle_outputs)
+            logger.warn(f"同时提取字幕失败，仅提取音频")
+            audio = self._ffmpeg.read_pcm_from_video(video_file, audio_index, duration=duration)
+        if audio is None:
+            logger.error(f"提取音频失败")
+            return False, None, None
+        logger.info(f"提取音频完成，时长 {round(len(audio) / 16000, 2)}秒")
+
+        # 同一音轨（不同版本的同一集）已转录过时直接复用
+        audio_fingerprint = None
+        if self._transcript_cache:
+            from plugins.autosubv2.asr.transcript_cache import fingerprint
+
+            audio_fingerprint = fingerprint(audio)
+            if audio_lang == 'auto':
+                # 配音版与原版共用音乐和音效，能量包络可能高度相关，语言未知时先检测语言，避免复用其他语言的转录结果
+                audio_lang = self.__detect_audio_language(audio, asr_model)
+            cached = self.__lookup_transcript(audio_fingerprint, asr_model, audio_lang) \
+                if audio_lang != 'auto' else None
+            if cached:
+                lang, subs, model = cached
+                del audio
+                self.__save_transcript_artifact(video_file, audio_index, model, lang, subs)
+                self.__save_srt(f"{subtitle_file}.{lang}.srt", subs)
+                logger.info(f"保存字幕文件：{subtitle_file}.{lang}.srt")
+                return True, lang, Path(f"{subtitle_file}.{lang}.srt")
+
+        # 预过滤静音与配乐，仅转录语音区间
+        time_map = None
+        if self._speech_prefilter:
+            speech_map = self.__get_speech_map(video_file, audio_index, audio)
+            if not speech_map.regions:
+                logger.warn(f"未检测到语音，跳过语音识别")
                 return False, None, None
+            audio = speech_map.extract(audio)
+            time_map = speech_map.to_original
+
+        # 断点与音频输入、模型、识别档位绑定，任一变化时重新转录
+        checkpoint_file = self.get_data_path() / "checkpoints" / \
+            f"{self.__media_identity(video_file, audio_index, asr_model, self._asr_profile, self._speech_prefilter)}.jsonl"
+
+        # 生成字幕
+        logger.info(f"开始生成字幕, 语言 {audio_lang}, 模型 {asr_model} ...")
+        ret, lang, subs = self.__do_speech_recognition(audio_lang, audio, asr_model=asr_model, time_map=time_map,
+                                                       checkpoint_file=checkpoint_file)
+        del audio
+        if ret:
+            logger.info(f"生成字幕成功，原始语言：{lang}")
+            if audio_fingerprint is not None:
+                self.__store_transcript(audio_fingerprint, asr_model, lang, subs)
+            self.__save_transcript_artifact(video_file, audio_index, asr_model, lang, subs)
+            self.__save_srt(f"{subtitle_file}.{lang}.srt", subs)
+            logger.info(f"保存字幕文件：{subtitle_file}.{lang}.srt")
+            return ret, lang, Path(f"{subtitle_file}.{lang}.srt")
+        else:
+            logger.error(f"生成字幕失败")
+            return False, None, None
+
+    def __lookup_transcript(self, audio_fingerprint, asr_model, audio_lang) -> Optional[Tuple[str, list]]:
+        """
+        按音频指纹查找已有的转录结果，主模型的结果优先
+        :return: (字幕语言, 字幕列表, 模型)，未命中时返回None
+        """
+        from plugins.autosubv2.asr.transcript_cache import TranscriptCache
+
+        try:
+            start = time.time()
+            models = list(dict.fromkeys([self._faster_whisper_model, asr_model]))
+            result = TranscriptCache(self.get_data_path() / "transcripts").lookup(
+                audio_fingerprint, models, self._asr_profile, audio_lang)
+        except Exception as e:
+            logger.warn(f"查找转录缓存失败：{e}")
+            return None
+        if not result:
+            logger.info(f"未找到相同音轨的转录结果，耗时 {round(time.time() - start, 2)}秒")
+            return None
+        lang, subs, entry, offset = result
+        logger.info(f"找到相同音轨的转录结果：模型 {entry['model']}，相似度 {entry['score']}，"
+                    f"时间偏移 {offset}秒，跳过语音识别")
+        if self._current_processing_task:
+            self._current_processing_task.asr_profile = entry["profile"]
+            self._current_processing_task.asr_model = entry["model"]
+            self._current_processing_task.asr_rtf = 0
+        return lang, subs, entry["model"]
+
+    def __transcript_key(self, video_file, audio_index, model) -> str:
+        return self._artifacts.key(self.__media_identity(video_file), audio_index,
+                                   model=model, profile=self._asr_profile, prefilter=self._speech_prefilter)
+
+    def __load_transcript_artifact(self, video_file, audio_index, asr_model) -> Optional[Tuple[str, list]]:
+        """
+        读取相同输入和识别参数的转录结果，主模型的结果优先
+        :return: (字幕语言, 字幕列表)，不存在时返回None
+        """
+        for model in dict.fromkeys([self._faster_whisper_model, asr_model]):
+            data = self._artifacts.load("transcript", self.__transcript_key(video_file, audio_index, model))
+            if not data:
+                continue
+            logger.info(f"使用已有的转录结果：模型 {model}，档位 {self._asr_profile}，跳过语音识别")
+            if self._current_processing_task:
+                self._current_processing_task.asr_profile = self._asr_profile
+                self._current_processing_task.asr_model = model
+                self._current_processing_task.asr_rtf = 0
+            return data["lang"], list(srt.parse(data["srt"]))
+        return None
+
+    def __save_transcript_artifact(self, video_file, audio_index, model, lang, subs):
+        try:
+            self._artifacts.save("transcript", self.__transcript_key(video_file, audio_index, model),
+                                 {"lang": lang, "model": model, "srt": srt.compose(subs)})
+        except Exception as e:
+            logger.warn(f"保存转录结果失败：{e}")
+
+    def __subtitle_artifact_path(self, video_file, subtitle_index) -> Path:
+        return self._artifacts.path("subtitle", self._artifacts.key(self.__media_identity(video_file), subtitle_index),
+                                    ".srt")
+
+    def __missing_subtitle_outputs(self, video_file, video_meta) -> Dict[int, Path]:
+        """
+        尚未提取的文本字幕流及其输出路径
+        """
+        image_based_subtitle_codecs = ('dvd_subtitle', 'dvb_subtitle', 'hdmv_pgs_subtitle')
+        outputs = {}
+        subtitle_streams = filter(lambda x: x.get('codec_type') == 'subtitle', video_meta.get('streams', []))
+        for index, stream in enumerate(subtitle_streams):
+            if 'width' in stream or stream.get('codec_name') in image_based_subtitle_codecs:
+                continue
+            path = self.__subtitle_artifact_path(video_file, index)
+            if not path.exists():
+                outputs[index] = path
+        if outputs:
+            next(iter(outputs.values())).parent.mkdir(parents=True, exist_ok=True)
+        return outputs
+
+    @staticmethod
+    def __discard_outputs(outputs: Dict[int, Path]):
+        """
+        提取失败时删除不完整的输出
+        """
+        for path in outputs.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+    def __get_video_metadata(self, video_file) -> Optional[dict]:
+        """
+        获取视频元数据，文件未变化时使用缓存的探测结果
+        """
+        return self._probe_cache.probe(video_file, self._ffmpeg.get_video_metadata)
+
+    @staticmethod
+    def __parse_path_limits(text: str) -> Dict[str, int]:
+        """
+        解析按路径设置的并发数，每行 "路径:并发数"
+        """
+        limits = {}
+        for line in text.split('\n'):
+            path, _, limit = line.strip().rpartition(':')
+            if path and limit.strip().isdigit():
+                limits[path.strip()] = int(limit)
+            elif line.strip():
+                logger.warn(f"无效的设备并发设置：{line}")
+        return limits
+
+    @staticmethod
+    def __media_duration(video_meta: dict) -> Optional[float]:
+        """
+        媒体时长（秒），用于计算 ffmpeg 超时
+        """
+        try:
+            return float(video_meta.get('format', {}).get('duration')) or None
+        except (TypeError, ValueError):
+            return None
+
+    def __prune_artifacts(self):
+        from plugins.autosubv2.asr.checkpoint import prune_checkpoints
+
+        try:
+            count = self._artifacts.prune(max_age_days=90)
+            if count:
+                logger.info(f"已清理 {count} 个过期的中间结果")
+            count = prune_checkpoints(self.get_data_path() / "checkpoints", max_age_days=30)
+            if count:
+                logger.info(f"已清理 {count} 个过期的转录断点")
+            count = self._probe_cache.prune()
+            if count:
+                logger.info(f"已清理 {count} 条过期或已删除文件的元数据缓存")
+            if self._translation_memory:
+                count = self._translation_memory.prune(max_age_days=180)
+                if count:
+                    logger.info(f"已清理 {count} 条翻译记忆")
+        except Exception as e:
+            logger.warn(f"清理中间结果失败：{e}")
+
+    def __store_transcript(self, audio_fingerprint, asr_model, lang, subs):
+        from plugins.autosubv2.asr.transcript_cache import TranscriptCache
+
+        try:
+            TranscriptCache(self.get_data_path() / "transcripts").store(
+                audio_fingerprint, asr_model, self._asr_profile, lang, subs)
+        except Exception as e:
+            logger.warn(f"保存转录缓存失败：{e}")
+
+    @staticmethod
+    def __media_identity(video_file, *extra) -> str:
+        """
+        媒体文件标识：路径、大小、修改时间不变时视为同一输入
+        """
+        stat = os.stat(video_file)
+        raw = "|".join(str(x) for x in (video_file, stat.st_size, stat.st_mtime_ns) + extra)
+        return hashlib.md5(raw.encode("utf8")).hexdigest()
+
+    def __get_speech_map(self, video_file, audio_index, audio):
+        """
+        获取语音区间，结果缓存在插件数据目录，任务重试时直接复用
+        """
+        from plugins.autosubv2.asr.speech_map import SpeechMap, detect_speech_regions
+
+        cache_file = self._artifacts.path("speech_map", self._artifacts.key(self.__media_identity(video_file),
+                                                                            audio_index, detector="energy-zcr"))
+        speech_map = SpeechMap.load(cache_file)
+        if speech_map:
+            self._artifacts.touch(cache_file)
+            logger.info(f"使用已缓存的语音区间：{cache_file}")
+        else:
+            start = time.time()
+            speech_map = SpeechMap(detect_speech_regions(audio))
+            speech_map.save(cache_file)
+            logger.info(f"语音区间检测完成，耗时 {round(time.time() - start, 2)}秒")
+        duration = len(audio) / 16000
+        logger.info(f"语音区间 {len(speech_map.regions)} 段，语音时长 {round(speech_map.speech_duration, 2)}秒，"
+                    f"占比 {round(speech_map.speech_duration / max(duration, 1) * 100, 1)}%")
+        return speech_map
 
     @staticmethod
     def __get_library_files(in_path, exclude_path=None):
@@ -663,17 +1508,6 @@ class AutoSubv2(_PluginBase):
                 if os.path.splitext(file)[-1].lower() in settings.RMT_MEDIAEXT:
                     yield cur_path
 
-    @staticmethod
-    def __load_srt(file_path):
-        """
-        加载字幕文件
-        :param file_path: 字幕文件路径
-        :return:
-        """
-        with open(file_path, 'r', encoding="utf8") as f:
-            srt_text = f.read()
-        return list(srt.parse(srt_text))
-
     @staticmethod
     def __save_srt(file_path, srt_data):
         """
@@ -685,50 +1519,17 @@ class AutoSubv2(_PluginBase):
         with open(file_path, 'w', encoding="utf8") as f:
             f.write(srt.compose(srt_data))
 
-    def __merge_srt(self, subtitle_data):
+    @staticmethod
+    def __merge_srt(subtitle_data):
         """
         合并整句字幕
         :param subtitle_data:
         :return:
         """
-        subtitle_data = copy.deepcopy(subtitle_data)
-        # 合并字幕
-        merged_subtitle = []
-        sentence_end = True
-        end_tokens = ['.', '!', '?', '。', '！', '？', '。"', '！"', '？"', '."', '!"', '?"']
-        for index, item in enumerate(subtitle_data):
-            # 当前字幕先将多行合并为一行，再去除首尾空格
-            content = item.content.replace('\n', ' ').strip()
-            # 去除html标签
-            parse = etree.HTML(content)
-            if parse is not None:
-                content = parse.xpath('string(.)')
-            if content == '':
-                continue
-            item.content = content
-
-            # 背景音等字幕，跳过
-            if self.__is_noisy_subtitle(content):
-                merged_subtitle.append(item)
-                sentence_end = True
-                continue
-
-            if not merged_subtitle or sentence_end:
-                merged_subtitle.append(item)
-            elif not sentence_end:
-                merged_subtitle[-1].content = f"{merged_subtitle[-1].content} {content}"
-                merged_subtitle[-1].end = item.end
-
-            # 如果当前字幕内容以标志符结尾，则设置语句已经终结
-            if content.endswith(tuple(end_tokens)):
-                sentence_end = True
-            # 如果上句字幕超过一定长度，则设置语句已经终结
-            elif len(merged_subtitle[-1].content) > 80:
-                sentence_end = True
-            else:
-                sentence_end = False
-
-        return merged_subtitle
+        merger = StreamingWordMerger()
+        for item in subtitle_data:
+            merger.feed(item.start.total_seconds(), item.end.total_seconds(), item.content)
+        return merger.to_subtitles()
 
     @staticmethod
     def __get_video_prefer_audio(video_meta, prefer_lang=None):
@@ -848,122 +1649,221 @@ class AutoSubv2(_PluginBase):
         logger.debug(f"命中内嵌字幕信息：{subtitle_index}, {subtitle_lang}, score:{subtitle_score}")
         return True, subtitle_index, subtitle_lang
 
-    @staticmethod
-    def __is_noisy_subtitle(content):
-        """
-        判断是否为背景音等字幕
-        :param content:
-        :return:
-        """
-        noisy_tokens = [('(', ')'), ('[', ']'), ('{', '}'), ('【', '】'), ('♪', '♪'), ('♫', '♫'), ('♪♪', '♪♪')]
-        return any(content.startswith(t[0]) and content.endswith(t[1]) for t in noisy_tokens)
-
-    def __get_context(self, all_subs: list, target_indices: List[int], is_batch: bool) -> str:
-        """通用上下文获取方法"""
-        min_idx = max(0, min(target_indices) - self._context_window)
-        max_idx = min(len(all_subs) - 1, max(target_indices) + self._context_window) if is_batch else min(
-            target_indices)
+    def __get_context(self, texts: List[str], target_indices: List[int], is_batch: bool, limit: int = None) -> str:
+        """通用上下文获取方法，limit 为批次前后相邻行的 token 上限"""
+        if is_batch and limit is not None:
+            min_idx, max_idx = context_bounds(texts, min(target_indices), max(target_indices),
+                                              self._context_window, limit)
+        else:
+            min_idx = max(0, min(target_indices) - self._context_window)
+            max_idx = min(len(texts) - 1, max(target_indices) + self._context_window) if is_batch else min(
+                target_indices)
 
         context = []
         for idx in range(min_idx, max_idx + 1):
             status = "[待译]" if idx in target_indices else ""
-            content = all_subs[idx].content.replace('\n', ' ').strip()
+            content = texts[idx].replace('\n', ' ').strip()
             context.append(f"{status}{content}")
 
         return "\n".join(context)
 
-    def __process_items(self, all_subs: list, items: list) -> list:
-        """统一处理入口（支持批量和单条）"""
-        if self._enable_batch and len(items) > 1:
-            return self.__process_batch(all_subs, items)
-        return [self.__process_single(all_subs, item) for item in items]
+    def __process_items(self, texts: List[str], indices: List[int]) -> List[Optional[str]]:
+        """统一处理入口（支持批量和单条），返回与 indices 对应的译文，翻译失败为None"""
+        if self._enable_batch and len(indices) > 1:
+            return self.__process_batch(texts, indices)
+        return [self.__process_single(texts, idx) for idx in indices]
+
+    def __count(self, key: str, value: int = 1):
+        """并发翻译时更新统计"""
+        with self._stats_lock:
+            self._stats[key] += value
 
-    def __translate_to_zh(self, text: str, context: str = None) -> (bool, str):
+    def __translate_to_zh(self, text: str, context: str = None, instruction: str = None) -> (bool, str):
         if self._event.is_set():
             raise UserInterruptException(f"用户中断当前任务")
+        self.__count('requests')
         
         if self._use_ollama: # 根据 _use_ollama 标志选择翻译器
             if not self._ollama:
                 logger.error("Ollama翻译器未初始化，无法进行翻译。")
                 return False, "Ollama翻译器未初始化。"
-            return self._ollama.translate_to_zh(text, context)
+            return self._ollama.translate_to_zh(text, context, instruction)
         else:
             if not self._openai:
                 logger.error("OpenAI翻译器未初始化，无法进行翻译。")
                 return False, "OpenAI翻译器未初始化。"
-            return self._openai.translate_to_zh(text, context)
-
-    def __process_batch(self, all_subs: list, batch: list) -> list:
-        """批量处理逻辑"""
-        indices = [all_subs.index(item) for item in batch]
-        context = self.__get_context(all_subs, indices, is_batch=True) if self._context_window > 0 else None
-        batch_text = '\n'.join([item.content for item in batch])
+            return self._openai.translate_to_zh(text, context, instruction)
 
+    def __process_batch(self, texts: List[str], indices: List[int]) -> List[Optional[str]]:
+        """批量处理逻辑，行数不匹配时二分重试，只有单独失败的行才逐行翻译"""
         try:
-            ret, result = self.__translate_to_zh(batch_text, context)
-            if not ret:
-                raise Exception(result)
-
-            translated = [line.strip() for line in result.split('\n') if line.strip()]
-            if len(translated) != len(batch):
-                raise Exception(f"批次行数不匹配 {len(translated)}/{len(batch)}")
-
-            for item, trans in zip(batch, translated):
-                item.content = f"{trans}\n{item.content}"
-            self._stats['batch_success'] += len(batch)
-            return batch
+            aligned = self.__request_batch(texts, indices)
+        except UserInterruptException:
+            raise
         except Exception as e:
+            # 接口错误拆分后大概率仍然失败，直接逐行翻译
             logger.warning(f"批次翻译失败（{str(e)}），降级到单行匹配...")
-            self._stats['batch_fail'] += 1
-            return [self.__process_single(all_subs, item) for item in batch]
+            self.__count('batch_fail')
+            return [self.__process_single(texts, idx) for idx in indices]
+        missing = [idx for idx in indices if idx not in aligned]
+        if missing:
+            self.__count('batch_fail')
+        self.__count('batch_success', len(indices) - len(missing))
+        if len(missing) == 1:
+            aligned[missing[0]] = self.__process_single(texts, missing[0])
+        elif missing:
+            self.__count('bisect')
+            middle = len(missing) // 2
+            for half in (missing[:middle], missing[middle:]):
+                aligned.update(zip(half, self.__process_items(texts, half)))
+        return [aligned[idx] for idx in indices]
+
+    def __request_batch(self, texts: List[str], indices: List[int]) -> Dict[int, str]:
+        """
+        发送一个批次
+        :return: 能与原文对齐的译文 {行序号: 译文}。编号/JSON 协议按编号对齐，部分行缺失时只返回已对齐的行；
+        纯文本协议行数不匹配时无法对齐，返回空
+        """
+        limit = self._batcher.context_limit(self.__translator_scope()[0]) if self._adaptive_batch else None
+        context = self.__get_context(texts, indices, is_batch=True, limit=limit) if self._context_window > 0 else None
+        batch_text = protocol.encode([texts[idx] for idx in indices], self._batch_protocol)
+
+        start = time.time()
+        ret, result = self.__translate_to_zh(batch_text, context, protocol.instruction(self._batch_protocol))
+        if not ret:
+            self.__record_batch(batch_text, context, start, failed=True)
+            raise Exception(result)
+
+        translated = protocol.decode(result, len(indices), self._batch_protocol)
+        if len(translated) != len(indices):
+            self.__record_batch(batch_text, context, start, mismatched=True)
+            logger.warning(f"批次行数不匹配 {len(translated)}/{len(indices)}，未对齐的行拆分后重试...")
+        else:
+            self.__record_batch(batch_text, context, start)
+        return {indices[position]: trans for position, trans in translated.items()}
+
+    def __record_batch(self, batch_text: str, context: Optional[str], start: float, **outcome):
+        """记录批量请求结果，用于调整批次预算"""
+        if not self._adaptive_batch:
+            return
+        # 与划分批次时一致：待译文本在上下文中再出现一次，前后相邻的上下文不计入
+        tokens = estimate_tokens(batch_text) * (2 if context else 1)
+        self._batcher.record(self.__translator_scope()[0], tokens, time.time() - start, **outcome)
 
-    def __process_single(self, all_subs: List[srt.Subtitle], item: srt.Subtitle) -> srt.Subtitle:
+    def __process_single(self, texts: List[str], idx: int) -> Optional[str]:
         """单条处理逻辑"""
         for _ in range(self._max_retries):
-            idx = all_subs.index(item)
-            context = self.__get_context(all_subs, [idx], is_batch=False) if self._context_window > 0 else None
-            success, trans = self.__translate_to_zh(item.content, context)
+            context = self.__get_context(texts, [idx], is_batch=False) if self._context_window > 0 else None
+            success, trans = self.__translate_to_zh(texts[idx], context)
 
             if success:
-                item.content = f"{trans}\n{item.content}"
-                self._stats['line_fallback'] += 1
-                return item
+                self.__count('line_fallback')
+                return trans
 
             time.sleep(1)
 
-        item.content = f"[翻译失败]\n{item.content}"
-        return item
+        self.__count('line_fail')
+        return None
+
+    def __translation_key(self, source_lang: str, source_text: str) -> str:
+        translator = self._ollama if self._use_ollama else self._openai
+        return self._artifacts.key(hashlib.md5(source_text.encode("utf8")).hexdigest(), source_lang,
+                                   translator="ollama" if self._use_ollama else "openai",
+                                   model=getattr(translator, "model", None),
+                                   enable_batch=self._enable_batch,
+                                   batch_size="auto" if self._adaptive_batch else self._batch_size,
+                                   batch_protocol=self._batch_protocol,
+                                   context_window=self._context_window, enable_merge=self._enable_merge)
 
-    def __translate_zh_subtitle(self, source_lang: str, source_subtitle: str, dest_subtitle: str):
-        self._stats = {'total': 0, 'batch_success': 0, 'batch_fail': 0, 'line_fallback': 0}
-        subs = self.__load_srt(source_subtitle)
+    def __translator_scope(self) -> Tuple[str, str]:
+        """
+        当前翻译器模型和提示词版本，用于翻译记忆和批次预算。批量翻译的提示词随协议变化，版本中包含协议
+        """
+        translator = self._ollama if self._use_ollama else self._openai
+        prompt = getattr(translator, "prompt_version", "")
+        if self._enable_batch:
+            prompt = f"{prompt}:{self._batch_protocol}"
+        return f"{'ollama' if self._use_ollama else 'openai'}:{getattr(translator, 'model', None)}", prompt
+
+    def __translate_zh_subtitle(self, source_lang: str, source_subtitle: str, dest_subtitle: str,
+                                reuse_translation: bool = True):
+        """
+        翻译字幕为中文
+        :param reuse_translation: 是否使用已有的翻译结果和翻译记忆，重新翻译时为否
+        """
+        self._stats = {'total': 0, 'batch_success': 0, 'batch_fail': 0, 'line_fallback': 0, 'line_fail': 0,
+                       'memory_hit': 0, 'batches': 0, 'requests': 0, 'bisect': 0}
+        with open(source_subtitle, 'r', encoding="utf8") as f:
+            source_text = f.read()
+        # 原文和翻译参数都未变化时直接使用已有的翻译结果
+        translation_key = self.__translation_key(source_lang, source_text)
+        translation = self._artifacts.load("translation", translation_key) if reuse_translation else None
+        if translation:
+            with open(dest_subtitle, 'w', encoding="utf8") as f:
+                f.write(translation["srt"])
+            logger.info(f"原文和翻译参数未变化，使用已有的翻译结果")
+            return
+        subs = list(srt.parse(source_text))
         if source_lang in ["en", "eng"] and self._enable_merge:
             valid_subs = self.__merge_srt(subs)
             logger.info(f"英文字幕合并：合并前字幕数: {len(subs)},合并后字幕数: {len(valid_subs)}")
         else:
             valid_subs = subs
         self._stats['total'] = len(valid_subs)
-        processed = []
-        current_batch = []
-
-        for item in valid_subs:
-            current_batch.append(item)
-
-            if len(current_batch) >= self._batch_size:
-                processed += self.__process_items(valid_subs, current_batch)
-                current_batch = []
-                logger.info(f"进度: {len(processed)}/{len(valid_subs)}")
-
-        if current_batch:
-            processed += self.__process_items(valid_subs, current_batch)
+        # 上下文取自原文快照，各批次互不依赖，可以并发请求
+        texts = [item.content for item in valid_subs]
+        # 翻译记忆中已有的行不再请求大模型，仍作为其他行的上下文
+        memory = self._translation_memory if self._use_translation_memory else None
+        model, prompt = self.__translator_scope()
+        # 重新翻译时不查询翻译记忆，新译文仍写入记忆，覆盖上次的结果
+        remembered = memory.lookup(texts, source_lang, model, prompt) if memory and reuse_translation else {}
+        for idx, trans in remembered.items():
+            valid_subs[idx].content = f"{trans}\n{valid_subs[idx].content}"
+        self._stats['memory_hit'] = len(remembered)
+        pending = [idx for idx in range(len(texts)) if idx not in remembered]
+        if self._enable_batch and self._adaptive_batch:
+            batches = self._batcher.plan(model, texts, pending, self._context_window)
+            logger.info(f"按预算 {self._batcher.budget(model)} tokens 划分批次")
+        else:
+            batches = [pending[start:start + self._batch_size] for start in range(0, len(pending), self._batch_size)]
+        self._stats['batches'] = len(batches)
+        concurrency = self._ollama_concurrency if self._use_ollama else self._openai_concurrency
+        logger.info(f"共 {len(batches)} 个批次，并发请求数 {concurrency}")
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="autosub-translate")
+        try:
+            futures = [executor.submit(self.__process_items, texts, batch) for batch in batches]
+            done = len(remembered)
+            # 按字幕顺序取回结果
+            for batch, future in zip(batches, futures):
+                results = future.result()
+                for idx, trans in zip(batch, results):
+                    item = valid_subs[idx]
+                    item.content = f"{trans}\n{item.content}" if trans is not None else f"[翻译失败]\n{item.content}"
+                if memory:
+                    memory.store([(texts[idx], trans) for idx, trans in zip(batch, results) if trans is not None],
+                                 source_lang, model, prompt)
+                done += len(batch)
+                logger.info(f"进度: {done}/{len(texts)}")
+        finally:
+            # 中断时取消未开始的批次
+            executor.shutdown(wait=True, cancel_futures=True)
+        processed = valid_subs
 
         self.__save_srt(dest_subtitle, processed)
+        if self._adaptive_batch:
+            self.save_data("translate_batching", self._batcher.state)
+        # 有翻译失败的行时不保存，下次重新翻译
+        if not self._stats['line_fail']:
+            self._artifacts.save("translation", translation_key, {"srt": srt.compose(processed)})
         logger.info(f"""
     翻译完成！
     总处理条目: {self._stats['total']}
-    批次成功: {self._stats['batch_success']} ({(self._stats['batch_success'] / self._stats['total']) * 100:.1f}%)
-    批次失败: {self._stats['batch_fail']}
+    翻译记忆命中: {self._stats['memory_hit']} ({(self._stats['memory_hit'] / max(self._stats['total'], 1)) * 100:.1f}%)
+    批次成功: {self._stats['batch_success']} ({(self._stats['batch_success'] / max(self._stats['total'], 1)) * 100:.1f}%)
+    批次失败: {self._stats['batch_fail']}（拆分重试 {self._stats['bisect']} 次）
     行补偿翻译: {self._stats['line_fallback']}
+    翻译失败: {self._stats['line_fail']}
+    请求次数: {self._stats['requests']}（计划批次 {self._stats['batches']}，放大 {self._stats['requests'] / max(self._stats['batches'], 1):.2f} 倍）
             """)
 
     @staticmethod
@@ -1074,7 +1974,7 @@ class AutoSubv2(_PluginBase):
         if exist:
             return True
 
-        video_meta = Ffmpeg().get_video_metadata(video_file)
+        video_meta = self.__get_video_metadata(video_file)
         if not video_meta:
             return False
         ret, subtitle_index, subtitle_lang = self.__get_video_prefer_subtitle(video_meta, prefer_lang=prefer_langs,
@@ -1188,6 +2088,86 @@ class AutoSubv2(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'retranslate',
+                                            'label': '仅重新翻译',
+                                            'hint': '使用已有字幕和转录结果重新翻译，覆盖已有的机翻字幕，不进行语音识别'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'scan_workers',
+                                            'label': '扫描并发数',
+                                            'hint': '并发探测媒体文件，已有目标字幕或内嵌中文字幕的文件不加入队列',
+                                            'placeholder': '8'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'io_device_limit',
+                                            'label': '单个磁盘 ffmpeg 并发数',
+                                            'hint': '同一磁盘或网络共享上同时运行的 ffmpeg / ffprobe 数量，机械硬盘建议1-2',
+                                            'placeholder': '2'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextarea',
+                                        'props': {
+                                            'model': 'io_path_limits',
+                                            'label': '按路径设置并发数',
+                                            'rows': 2,
+                                            'placeholder': '路径:并发数，每行一个，如 /media/ssd:8',
+                                            'hint': '按路径所在磁盘设置，未设置的磁盘使用上方的并发数'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'io_readahead',
+                                            'label': '预读(MB)',
+                                            'hint': '启动 ffmpeg 前提示系统预读文件头部，0为不预读',
+                                            'placeholder': '16'
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -1288,6 +2268,213 @@ class AutoSubv2(_PluginBase):
                                             'hint': '需配置MP环境变量PROXY_HOST',
                                             'label': '使用代理下载模型'
                                         }
+                                    },
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'update_model',
+                                            'hint': '保存后在后台重新下载当前模型，任务执行时不会访问网络',
+                                            'label': '下载/更新模型'
+                                        }
+                                    },
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'run_calibration',
+                                            'hint': '保存后在后台测试各计算精度与线程组合，结果见插件详情页。请在空闲时执行',
+                                            'label': '性能校准'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'props': {'v-show': 'enable_asr'},
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSelect',
+                                        'props': {
+                                            'model': 'asr_profile',
+                                            'label': '识别档位',
+                                            'hint': '快速：贪心解码；均衡：beam search；精确：float32精度并启用温度回退',
+                                            'items': [
+                                                {'title': '快速', 'value': 'fast'},
+                                                {'title': '均衡', 'value': 'balanced'},
+                                                {'title': '精确', 'value': 'accurate'}
+                                            ]
+                                        }
+                                    },
+                                    {
+                                        'component': 'VSelect',
+                                        'props': {
+                                            'model': 'asr_mode',
+                                            'label': '推理模式',
+                                            'hint': '批量推理需 faster-whisper 1.1.0 以上版本，多核CPU上吞吐更高',
+                                            'items': [
+                                                {'title': '顺序推理', 'value': 'sequential'},
+                                                {'title': '批量推理', 'value': 'batched'}
+                                            ]
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'speech_prefilter',
+                                            'label': '语音预过滤',
+                                            'hint': '按能量和过零率跳过静音、片尾和配乐，仅转录语音区间'
+                                        }
+                                    },
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'model_idle_timeout',
+                                            'label': '模型空闲释放时间(分钟)',
+                                            'hint': '模型常驻内存供后续任务复用，空闲超过该时间后释放，0为任务结束立即释放',
+                                            'placeholder': '30'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'asr_workers',
+                                            'label': '并行转录数',
+                                            'hint': '长音频在静音处切分后并行转录，物理核心在各并行任务间均分，1为不切分。留空使用性能校准结果',
+                                            'placeholder': '自动',
+                                            'v-show': "asr_mode !== 'batched'"
+                                        }
+                                    },
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'asr_batch_size',
+                                            'label': '批量推理批大小',
+                                            'hint': '批量推理时每批送入模型的音频片段数，越大吞吐越高，占用内存越多',
+                                            'placeholder': '8',
+                                            'v-show': "asr_mode === 'batched'"
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'props': {'v-show': 'enable_asr'},
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSelect',
+                                        'props': {
+                                            'model': 'fallback_model',
+                                            'label': '积压时备用模型',
+                                            'hint': '任务积压预计耗时超过阈值时改用该模型，积压缓解后切回',
+                                            'clearable': True,
+                                            'items': ['tiny', 'base', 'small', 'medium',
+                                                      'large-v2', 'large-v3',
+                                                      {'title': 'large-v3-turbo',
+                                                       'value': 'deepdml/faster-whisper-large-v3-turbo-ct2'},
+                                                      ]
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'backlog_threshold',
+                                            'label': '积压阈值(小时)',
+                                            'hint': '按队列任务数、平均时长和实时率估算清空队列所需时间',
+                                            'placeholder': '12'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'requeue_fallback',
+                                            'label': '用主模型重新处理',
+                                            'hint': '保存后将由备用模型生成字幕的任务重新加入队列，覆盖已有字幕'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'props': {'v-show': 'enable_asr'},
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'asr_isolation',
+                                            'label': '独立进程识别',
+                                            'hint': '在独立进程中运行语音识别，停止任务时立即终止，崩溃不影响MoviePilot'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'asr_memory_limit',
+                                            'label': '识别进程内存上限(MB)',
+                                            'hint': '超出后终止识别进程，重启后从断点继续，留空不限制',
+                                            'placeholder': '不限制',
+                                            'v-show': 'asr_isolation'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'transcript_cache',
+                                            'label': '复用相同音轨的转录',
+                                            'hint': '同一集的其他版本（WEB-DL、BluRay等）已转录过时直接复用字幕并校正时间偏移'
+                                        }
                                     }
                                 ]
                             }
@@ -1586,6 +2773,86 @@ class AutoSubv2(_PluginBase):
                                                                 }
                                                             }
                                                         ]
+                                                    },
+                                                    {
+                                                        'component': 'VCol',
+                                                        'props': {'cols': 12, 'md': 4},
+                                                        'content': [
+                                                            {
+                                                                'component': 'VTextField',
+                                                                'props': {
+                                                                    'model': 'openai_concurrency',
+                                                                    'label': '并发请求数',
+                                                                    'hint': '同时进行的翻译请求数，受接口速率限制时调低',
+                                                                    'placeholder': '4',
+                                                                    'v-show': '!use_ollama',
+                                                                    'v-if': '!use_ollama'
+                                                                }
+                                                            },
+                                                            {
+                                                                'component': 'VTextField',
+                                                                'props': {
+                                                                    'model': 'ollama_concurrency',
+                                                                    'label': '并发请求数',
+                                                                    'hint': '同时进行的翻译请求数，需要 Ollama 设置 OLLAMA_NUM_PARALLEL',
+                                                                    'placeholder': '1',
+                                                                    'v-show': 'use_ollama',
+                                                                    'v-if': 'use_ollama'
+                                                                }
+                                                            }
+                                                        ]
+                                                    }
+                                                ]
+                                            },
+                                            {
+                                                'component': 'VRow',
+                                                'content': [
+                                                    {
+                                                        'component': 'VCol',
+                                                        'props': {'cols': 12, 'md': 4},
+                                                        'content': [
+                                                            {
+                                                                'component': 'VSwitch',
+                                                                'props': {
+                                                                    'model': 'translation_memory',
+                                                                    'label': '翻译记忆',
+                                                                    'hint': '保存逐行译文，相同模型再次遇到相同原文时直接使用，不请求大模型'
+                                                                }
+                                                            }
+                                                        ]
+                                                    },
+                                                    {
+                                                        'component': 'VCol',
+                                                        'props': {'cols': 12, 'md': 4, 'v-show': 'enable_batch'},
+                                                        'content': [
+                                                            {
+                                                                'component': 'VSwitch',
+                                                                'props': {
+                                                                    'model': 'adaptive_batch',
+                                                                    'label': '自动调整批次大小',
+                                                                    'hint': '按文本长度划分批次，根据行数不匹配和耗时自动调整，开启后不使用每批翻译行数'
+                                                                }
+                                                            }
+                                                        ]
+                                                    },
+                                                    {
+                                                        'component': 'VCol',
+                                                        'props': {'cols': 12, 'md': 4, 'v-show': 'enable_batch'},
+                                                        'content': [
+                                                            {
+                                                                'component': 'VSelect',
+                                                                'props': {
+                                                                    'model': 'batch_protocol',
+                                                                    'label': '批量翻译格式',
+                                                                    'hint': '编号格式可按编号对齐译文，部分行错位时只重试未对齐的行',
+                                                                    'items': [
+                                                                        {'title': '编号行', 'value': 'numbered'},
+                                                                        {'title': 'JSON', 'value': 'json'},
+                                                                        {'title': '纯文本', 'value': 'plain'}
+                                                                    ]
+                                                                }
+                                                            }
+                                                        ]
                                                     }
                                                 ]
                                             }
@@ -1640,6 +2907,11 @@ class AutoSubv2(_PluginBase):
             "send_notify": False,
             "listen_transfer_event": True,
             "run_now": False,
+            "retranslate": False,
+            "scan_workers": 8,
+            "io_device_limit": 2,
+            "io_path_limits": "",
+            "io_readahead": 16,
             "path_list": "",
             "file_size": "10",
             "translate_preference": "english_first",
@@ -1647,6 +2919,20 @@ class AutoSubv2(_PluginBase):
             "enable_asr": True,
             "faster_whisper_model": "base",
             "proxy": True,
+            "update_model": False,
+            "run_calibration": False,
+            "model_idle_timeout": 30,
+            "asr_profile": "balanced",
+            "asr_mode": "sequential",
+            "asr_workers": None,
+            "asr_batch_size": 8,
+            "speech_prefilter": False,
+            "fallback_model": None,
+            "backlog_threshold": 12,
+            "requeue_fallback": False,
+            "asr_isolation": True,
+            "asr_memory_limit": None,
+            "transcript_cache": True,
             "use_chatgpt": True,
             "use_chatgpt_trigger": 0,
             "use_ollama": False,  # 新增默认值
@@ -1663,10 +2949,33 @@ class AutoSubv2(_PluginBase):
             "enable_merge": False,
             "enable_batch": True,
             "batch_size": 10,
+            "openai_concurrency": 4,
+            "ollama_concurrency": 1,
+            "translation_memory": True,
+            "adaptive_batch": True,
+            "batch_protocol": "numbered",
         }
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        return [
+            {
+                "path": "/calibrate",
+                "endpoint": self.api_calibrate,
+                "methods": ["GET"],
+                "summary": "性能校准",
+                "description": "测试各计算精度与线程组合，保存当前CPU下最快的配置",
+            }
+        ]
+
+    def api_calibrate(self):
+        """
+        API：执行性能校准
+        """
+        if not self._enabled or not self._enable_asr:
+            return schemas.Response(success=False, message="插件未启用或未开启语音识别")
+        if not self.__start_calibration():
+            return schemas.Response(success=False, message="性能校准正在进行中或模型尚未下载")
+        return schemas.Response(success=True, message="性能校准已在后台开始")
 
     def get_page(self) -> List[dict]:
         # 加载任务并按添加时间倒序排列
@@ -1691,6 +3000,8 @@ class AutoSubv2(_PluginBase):
                 TaskSource.MANUAL: "手动添加",
                 TaskSource.EVENT: "入库触发"
             }.get(task.source, task.source)
+            if task.task_type == TaskType.RETRANSLATE:
+                source_label += "(重新翻译)"
 
             status_text = {
                 TaskStatus.PENDING: "等待中",
@@ -1707,6 +3018,9 @@ class AutoSubv2(_PluginBase):
                 task.complete_time.strftime("%Y-%m-%d %H:%M:%S")
                 if task.complete_time else "-"
             )
+            asr_str = f"{task.asr_model or ''} {task.asr_profile} / RTF {task.asr_rtf}".strip() if task.asr_profile else "-"
+            if task.detected_lang:
+                asr_str += f" / {task.detected_lang}({task.detected_lang_prob})"
 
             rows.append({
                 "component": "tr",
@@ -1716,6 +3030,7 @@ class AutoSubv2(_PluginBase):
                     {"component": "td", "text": task.video_file},
                     {"component": "td", "text": source_label},
                     {"component": "td", "text": complete_time_str},
+                    {"component": "td", "text": asr_str},
                     {
                         "component": "td",
                         "props": {"class": status_class},
@@ -1724,7 +3039,103 @@ class AutoSubv2(_PluginBase):
                 ],
             })
 
-        return [
+        calibration_rows = []
+        for calibration in (self.get_data("calibration") or {}).values():
+            best = calibration.get("best") or {}
+            for result in calibration.get("results") or []:
+                is_best = result == best
+                calibration_rows.append({
+                    "component": "tr",
+                    "props": {"class": "text-sm text-success" if is_best else "text-sm"},
+                    "content": [
+                        {"component": "td", "text": calibration.get("cpu")},
+                        {"component": "td", "text": calibration.get("model")},
+                        {"component": "td", "text": result.get("compute_type")},
+                        {"component": "td", "text": f"{result.get('cpu_threads')} x {result.get('num_workers')}"},
+                        {"component": "td", "text": f"{result.get('rtf')}{' (最快)' if is_best else ''}"},
+                    ],
+                })
+
+        calibration_page = []
+        if calibration_rows:
+            calibration_page = [
+                {
+                    "component": "VRow",
+                    "content": [
+                        {
+                            "component": "VCol",
+                            "props": {"cols": 12},
+                            "content": [
+                                {
+                                    "component": "VTable",
+                                    "props": {"hover": True, "density": "compact"},
+                                    "content": [
+                                        {
+                                            "component": "thead",
+                                            "content": [
+                                                {
+                                                    "component": "th",
+                                                    "props": {"class": "text-start ps-4"},
+                                                    "text": text
+                                                } for text in ["CPU", "模型", "计算精度", "线程 x 并行", "RTF"]
+                                            ]
+                                        },
+                                        {"component": "tbody", "content": calibration_rows}
+                                    ]
+                                }
+                            ]
+                        }
+                    ]
+                }
+            ]
+
+        stats_page = []
+        probe_stats = self._probe_cache.stats() if self._probe_cache else None
+        if probe_stats and probe_stats["total"]:
+            stats_page = [
+                {
+                    "component": "VRow",
+                    "content": [
+                        {
+                            "component": "VCol",
+                            "props": {"cols": 12},
+                            "content": [
+                                {
+                                    "component": "VAlert",
+                                    "props": {"type": "info", "variant": "tonal", "density": "compact",
+                                              "text": f"元数据缓存：命中 {probe_stats['hit']} 次，"
+                                                      f"未命中 {probe_stats['miss']} 次"
+                                                      f"（其中文件已变化 {probe_stats['invalidated']} 次），"
+                                                      f"命中率 {probe_stats['hit_rate']}%"}
+                                }
+                            ]
+                        }
+                    ]
+                }
+            ]
+
+        io_stats = [device for device in io_scheduler.stats() if device["active"] or device["waiting"]]
+        if io_stats:
+            stats_page.append({
+                "component": "VRow",
+                "content": [
+                    {
+                        "component": "VCol",
+                        "props": {"cols": 12},
+                        "content": [
+                            {
+                                "component": "VAlert",
+                                "props": {"type": "info", "variant": "tonal", "density": "compact",
+                                          "text": "磁盘队列：" + "；".join(
+                                              f"{device['device']} 运行 {device['active']}/{device['limit']}，"
+                                              f"排队 {device['waiting']}" for device in io_stats)}
+                            }
+                        ]
+                    }
+                ]
+            })
+
+        return calibration_page + stats_page + [
             {
                 "component": "VRow",
                 "content": [
@@ -1759,6 +3170,11 @@ class AutoSubv2(_PluginBase):
                                                 "props": {"class": "text-start ps-4"},
                                                 "text": "完成时间"
                                             },
+                                            {
+                                                "component": "th",
+                                                "props": {"class": "text-start ps-4"},
+                                                "text": "语音识别"
+                                            },
                                             {
                                                 "component": "th",
                                                 "props": {"class": "text-start ps-4"},
@@ -1791,10 +3207,15 @@ class AutoSubv2(_PluginBase):
         """
         if self._running:
             self._event.set()
+        scans = self.__stop_scans()
         if self._consumer_thread and self._consumer_thread.is_alive():
             logger.info("正在停止当前任务...")
             # self._consumer_thread.join(timeout=3)
             self._consumer_thread.join()
+        # 等待扫描结束后再清空队列，扫描不会再加入新任务
+        for thread in scans:
+            if thread is not threading.current_thread():
+                thread.join()
 
         if self._task_queue:
             while not self._task_queue.empty():
@@ -1802,12 +3223,13 @@ class AutoSubv2(_PluginBase):
                 self._task_queue.task_done()
             logger.info("任务队列已清空")
         if self._tasks is not None:
-            for task_id in list(self._tasks.keys()):
-                task = self._tasks[task_id]
-                if task.status == TaskStatus.PENDING or task.status == TaskStatus.IN_PROGRESS:
-                    task.status = TaskStatus.FAILED
-                    task.complete_time = datetime.now()
-            self.save_tasks()  # 持久化更新后的任务列表
+            with self._tasks_lock:
+                for task_id in list(self._tasks.keys()):
+                    task = self._tasks[task_id]
+                    if task.status == TaskStatus.PENDING or task.status == TaskStatus.IN_PROGRESS:
+                        task.status = TaskStatus.FAILED
+                        task.complete_time = datetime.now()
+                self.save_tasks()  # 持久化更新后的任务列表
         self._running = False
         self._event.clear()
         logger.info(f"自动字幕生成服务已停止")
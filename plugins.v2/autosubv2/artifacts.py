@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+
+class ArtifactStore:
+    """
+    分阶段的中间结果存储：内嵌字幕、语音区间、原始转录、翻译结果。
+    每个结果按输入标识和该阶段的参数索引，重新处理时只执行输入或参数变化的阶段
+    """
+
+    def __init__(self, root: Path):
+        self._root = Path(root)
+
+    @staticmethod
+    def key(*inputs, **params) -> str:
+        """
+        生成结果键
+        :param inputs: 输入标识
+        :param params: 该阶段参数
+        """
+        raw = json.dumps([inputs, params], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.md5(raw.encode("utf8")).hexdigest()
+
+    def path(self, stage: str, key: str, suffix: str = ".json") -> Path:
+        return self._root / stage / f"{key}{suffix}"
+
+    def load(self, stage: str, key: str) -> Optional[Any]:
+        file = self.path(stage, key)
+        if not file.exists():
+            return None
+        try:
+            with open(file, encoding="utf8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self.touch(file)
+        return data
+
+    @staticmethod
+    def touch(file: Path):
+        """
+        更新修改时间，清理按修改时间判断是否长期未使用，命中时需调用
+        """
+        try:
+            os.utime(file)
+        except OSError:
+            pass
+
+    def save(self, stage: str, key: str, data: Any):
+        file = self.path(stage, key)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        tmp_file.replace(file)
+
+    def prune(self, max_age_days: int = 90) -> int:
+        """
+        删除长期未使用的结果
+        :return: 删除的文件数
+        """
+        if not self._root.exists():
+            return 0
+        expire = time.time() - max_age_days * 86400
+        count = 0
+        for stage_dir in self._root.iterdir():
+            if not stage_dir.is_dir():
+                continue
+            for file in stage_dir.iterdir():
+                try:
+                    if file.stat().st_mtime < expire:
+                        os.remove(file)
+                        count += 1
+                except OSError:
+                    continue
+        return count
@@ -0,0 +1,133 @@
+"""
+语音识别性能基准：在同一段音频上比较单次顺序转录、批量推理与分段并行转录的实时率（RTF）和峰值内存。
+每种方式在独立进程中运行，峰值内存互不影响。不导入插件主模块和 MoviePilot，可在容器内直接运行：
+
+    python benchmark.py --model-path <faster-whisper 模型目录> [--audio <音视频文件>] [--seconds 900] [--workers 2]
+
+未指定音频时使用合成的类语音音频并关闭 VAD，结果只适合比较各方式的相对速度；指定音视频文件时由 ffmpeg 解码第一条音轨
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from worker_process import _bootstrap
+
+# 测试的转录方式：(名称, 说明)
+MODES = [
+    ("sequential", "单次顺序转录"),
+    ("batched", "批量推理"),
+    ("chunked", "分段并行转录"),
+]
+
+
+def load_audio(audio_file: str, seconds: int):
+    """
+    解码音视频文件的第一条音轨为 16000hz float32，最多取前 seconds 秒
+    """
+    import numpy as np
+
+    command = ["ffmpeg", "-v", "error", "-i", audio_file, "-map", "0:a:0", "-t", str(seconds),
+               "-ac", "1", "-ar", "16000", "-f", "s16le", "-"]
+    pcm = subprocess.run(command, stdout=subprocess.PIPE, check=True).stdout
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def synthetic_audio(seconds: int):
+    import numpy as np
+    from plugins.autosubv2.asr.synthetic import synth_clip
+
+    clip = synth_clip(60)
+    return np.tile(clip, seconds // 60 + 1)[:seconds * 16000]
+
+
+def run_mode(args) -> dict:
+    """
+    在当前进程中按指定方式转录一次
+    """
+    import psutil
+    from plugins.autosubv2.asr.engine import LocalEngine, load_model
+    from plugins.autosubv2.asr.profiles import build_transcribe_options
+
+    audio = load_audio(args.audio, args.seconds) if args.audio else synthetic_audio(args.seconds)
+    cores = psutil.cpu_count(logical=False) or 1
+    # 分段并行时物理核心在各 worker 间均分，其余方式单个 worker 使用全部核心
+    workers = args.workers if args.run == "chunked" else 1
+    compute_type, options = build_transcribe_options(args.profile, word_timestamps=False)
+    if not args.audio:
+        options["vad_filter"] = False
+
+    start = time.time()
+    engine = LocalEngine(load_model(args.model_path, args.compute_type or compute_type,
+                                    max(1, cores // workers), workers))
+    load_time = time.time() - start
+
+    start = time.time()
+    mode, segments, _ = engine.transcribe(audio, language=args.language, mode=args.run, workers=workers,
+                                          batch_size=args.batch_size, **options)
+    count = sum(1 for _ in segments)
+    elapsed = time.time() - start
+    duration = len(audio) / 16000
+    return {
+        "mode": mode,
+        "duration": round(duration, 1),
+        "segments": count,
+        "load": round(load_time, 2),
+        "elapsed": round(elapsed, 2),
+        "rtf": round(elapsed / max(duration, 1), 4),
+        # Linux 下 ru_maxrss 单位为 KB
+        "peak_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="语音识别性能基准")
+    parser.add_argument("--model-path", required=True, help="faster-whisper 模型目录")
+    parser.add_argument("--audio", help="音视频文件，未指定时使用合成音频")
+    parser.add_argument("--seconds", type=int, default=900, help="测试音频时长，分段并行需超过600秒")
+    parser.add_argument("--workers", type=int, default=2, help="分段并行的并行数")
+    parser.add_argument("--batch-size", type=int, default=8, help="批量推理批大小")
+    parser.add_argument("--profile", default="balanced", help="识别档位")
+    parser.add_argument("--compute-type", help="计算精度，默认使用档位设置，档位为 auto 时为 int8")
+    parser.add_argument("--language", default="en", help="音频语言，指定后跳过语言检测")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    _bootstrap()
+    if args.compute_type is None:
+        from plugins.autosubv2.asr.profiles import get_profile
+
+        if get_profile(args.profile)["compute_type"] == "auto":
+            args.compute_type = "int8"
+
+    if args.run:
+        print(json.dumps(run_mode(args)))
+        return
+
+    results = []
+    for mode, title in MODES:
+        command = [sys.executable, str(Path(__file__).resolve())] + sys.argv[1:] + ["--run", mode]
+        process = subprocess.run(command, stdout=subprocess.PIPE, text=True)
+        if process.returncode != 0:
+            print(f"{title} 运行失败，退出码 {process.returncode}")
+            continue
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        result["title"] = title
+        result["requested"] = mode
+        results.append(result)
+        print(f"{title}：{result}")
+
+    # 批量推理不可用时回退为顺序推理，以请求的方式确定基准
+    baseline = next((r for r in results if r["requested"] == "sequential"), None)
+    print(f"\n{'方式':<12}{'实际方式':<12}{'RTF':>8}{'加速比':>8}{'峰值内存(MB)':>14}{'加载(s)':>10}")
+    for result in results:
+        speedup = round(baseline["rtf"] / result["rtf"], 2) if baseline and result["rtf"] else "-"
+        print(f"{result['title']:<12}{result['mode']:<12}{result['rtf']:>8}{speedup:>8}"
+              f"{result['peak_mb']:>14}{result['load']:>10}")
+
+
+if __name__ == "__main__":
+    main()
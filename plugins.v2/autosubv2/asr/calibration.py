@@ -0,0 +1,95 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+import psutil
+
+from app.log import logger
+from plugins.autosubv2.asr.synthetic import synth_clip
+
+COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+
+
+def cpu_signature() -> str:
+    """
+    当前CPU标识，校准结果按CPU型号和核心数区分
+    """
+    name = ""
+    try:
+        with open("/proc/cpuinfo", encoding="utf8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    name = line.split(":", 1)[1].strip()
+                    break
+    except Exception:
+        pass
+    return f"{name or 'unknown'} ({psutil.cpu_count(logical=False)}C/{psutil.cpu_count()}T)"
+
+
+def candidate_splits(physical_cores: int) -> List[Tuple[int, int]]:
+    """
+    候选的 (cpu_threads, num_workers) 组合
+    """
+    splits = []
+    for workers in (1, 2, 4):
+        threads = physical_cores // workers
+        if threads >= 1 and (threads, workers) not in splits:
+            splits.append((threads, workers))
+    return splits
+
+
+def calibrate(model: str, model_path: str, should_stop: Callable[[], bool],
+              clip_seconds: int = 30) -> Optional[dict]:
+    """
+    依次测试各计算精度与线程/并行组合，以吞吐量（音频秒数/耗时）选出最快配置
+    :param model: 模型名称
+    :param model_path: 本地模型目录
+    :param should_stop: 是否中断
+    :param clip_seconds: 测试音频时长
+    :return: 校准结果
+    """
+    from faster_whisper import WhisperModel
+
+    clip = synth_clip(clip_seconds)
+    results = []
+    for compute_type in COMPUTE_TYPES:
+        for cpu_threads, num_workers in candidate_splits(psutil.cpu_count(logical=False)):
+            if should_stop():
+                return None
+            try:
+                whisper = WhisperModel(model_path, device="cpu", compute_type=compute_type,
+                                       cpu_threads=cpu_threads, num_workers=num_workers)
+            except ValueError as e:
+                logger.info(f"性能校准：当前CPU不支持 {compute_type}，跳过：{e}")
+                break
+
+            def run(_):
+                segments, _ = whisper.transcribe(clip, language="en", vad_filter=False, beam_size=1,
+                                                 temperature=0, condition_on_previous_text=False)
+                return list(segments)
+
+            # 预热一次，避免首次推理的初始化开销影响结果
+            run(0)
+            start = time.time()
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                list(executor.map(run, range(num_workers)))
+            elapsed = time.time() - start
+            del whisper
+            result = {
+                "compute_type": compute_type,
+                "cpu_threads": cpu_threads,
+                "num_workers": num_workers,
+                "rtf": round(elapsed / (clip_seconds * num_workers), 4),
+            }
+            logger.info(f"性能校准：{result}")
+            results.append(result)
+    if not results:
+        return None
+    return {
+        "model": model,
+        "cpu": cpu_signature(),
+        "time": datetime.now().isoformat(),
+        "results": results,
+        "best": min(results, key=lambda x: x["rtf"]),
+    }
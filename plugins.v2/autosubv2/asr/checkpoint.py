@@ -0,0 +1,115 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from plugins.autosubv2.asr.chunked import TimedSegment, TimedWord
+
+
+def shift_segments(segments: Iterable, offset: float) -> Iterator[TimedSegment]:
+    """
+    将转录结果转换为 TimedSegment，并整体平移时间戳
+    """
+    for segment in segments:
+        words = [TimedWord(w.start + offset, w.end + offset, w.word) for w in (segment.words or [])]
+        yield TimedSegment(segment.start + offset, segment.end + offset, segment.text, words)
+
+
+class TranscriptCheckpoint:
+    """
+    转录断点文件。每转录出一段即追加写入，任务中断后可从最后一段的结束时间继续转录
+    文件格式为 JSON Lines，首行为 {"lang": 语言}，其后每行一段
+    """
+    # 每写入多少段同步一次磁盘
+    SYNC_EVERY = 20
+
+    def __init__(self, file: Path):
+        self._file = Path(file)
+        self._fp = None
+        self._pending = 0
+        # 最后一个完整行的结束位置，续写前截断之后的残缺内容
+        self._valid_size = 0
+        self.lang: Optional[str] = None
+        self.segments: List[TimedSegment] = []
+
+    @property
+    def resume_at(self) -> float:
+        return self.segments[-1].end if self.segments else 0.0
+
+    def load(self) -> "TranscriptCheckpoint":
+        """
+        读取已有断点，忽略末尾未写完整的行
+        """
+        if not self._file.exists():
+            return self
+        with open(self._file, "rb") as f:
+            for line in f:
+                # 进程被终止时最后一行可能只写了一部分，没有换行符的行视为不完整
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    break
+                if "lang" in data:
+                    self.lang = data["lang"]
+                else:
+                    self.segments.append(TimedSegment(data["s"], data["e"], data["t"],
+                                                      [TimedWord(*w) for w in data.get("w", [])]))
+                self._valid_size += len(line)
+        return self
+
+    def start(self, lang: str):
+        """
+        开始写入，新断点写入语言信息，已有断点截断末尾不完整的行后续写
+        """
+        self._file.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.segments
+        if not is_new:
+            os.truncate(self._file, self._valid_size)
+        self._fp = open(self._file, "w" if is_new else "a", encoding="utf8")
+        if is_new:
+            self.lang = lang
+            self._fp.write(json.dumps({"lang": lang}) + "\n")
+            self._fp.flush()
+
+    def append(self, segment: TimedSegment):
+        self.segments.append(segment)
+        self._fp.write(json.dumps({"s": segment.start, "e": segment.end, "t": segment.text,
+                                   "w": [list(w) for w in segment.words]}, ensure_ascii=False) + "\n")
+        self._fp.flush()
+        self._pending += 1
+        if self._pending >= self.SYNC_EVERY:
+            os.fsync(self._fp.fileno())
+            self._pending = 0
+
+    def close(self):
+        if self._fp:
+            self._fp.close()
+            self._fp = None
+
+    def remove(self):
+        self.close()
+        if self._file.exists():
+            self._file.unlink()
+
+
+def prune_checkpoints(directory: Path, max_age_days: int = 30) -> int:
+    """
+    删除长期未续写的断点。媒体文件被替换、删除或识别配置变更后，旧断点不会再被使用
+    :return: 删除的文件数
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        return 0
+    expire = time.time() - max_age_days * 86400
+    count = 0
+    for file in directory.glob("*.jsonl"):
+        try:
+            if file.stat().st_mtime < expire:
+                os.remove(file)
+                count += 1
+        except OSError:
+            continue
+    return count
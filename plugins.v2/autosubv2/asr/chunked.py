@@ -0,0 +1,167 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+# 音频超过该时长（秒）才分段并行转录，较短的音频分段开销大于收益
+CHUNK_MIN_SECONDS = 600
+
+
+class TimedWord(NamedTuple):
+    start: float
+    end: float
+    word: str
+
+
+class TimedSegment(NamedTuple):
+    start: float
+    end: float
+    text: str
+    words: List[TimedWord]
+
+
+def frame_energy(audio: np.ndarray, frame_ms: int = 50) -> np.ndarray:
+    """
+    计算分帧能量(RMS)
+    :param audio: 16000hz float32 音频
+    :param frame_ms: 帧长（毫秒）
+    :return: 每帧能量
+    """
+    frame = SAMPLE_RATE * frame_ms // 1000
+    count = len(audio) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:count * frame].reshape(count, frame)
+    return np.sqrt(np.mean(np.square(frames), axis=1))
+
+
+def find_split_points(audio: np.ndarray, n_chunks: int, search_seconds: float = 30,
+                      frame_ms: int = 50) -> List[int]:
+    """
+    将音频均分为 n_chunks 段，并在每个均分点附近寻找能量最低的位置作为切分点，避免切断语句
+    :return: 切分点采样位置列表（不含首尾）
+    """
+    energy = frame_energy(audio, frame_ms)
+    frame = SAMPLE_RATE * frame_ms // 1000
+    radius = min(int(search_seconds * 1000 / frame_ms), len(energy) // (2 * n_chunks))
+    points = []
+    for i in range(1, n_chunks):
+        center = len(energy) * i // n_chunks
+        lo = max(center - radius, (points[-1] // frame + 1) if points else 0)
+        hi = min(center + radius, len(energy))
+        if lo >= hi:
+            continue
+        points.append((lo + int(np.argmin(energy[lo:hi]))) * frame)
+    return points
+
+
+def _shift_segments(segments, offset: float, should_stop: Callable[[], bool]) -> List[TimedSegment]:
+    result = []
+    for segment in segments:
+        if should_stop():
+            break
+        words = [TimedWord(w.start + offset, w.end + offset, w.word) for w in (segment.words or [])]
+        result.append(TimedSegment(segment.start + offset, segment.end + offset, segment.text, words))
+    return result
+
+
+def _stitch(chunks: List[List[TimedSegment]]) -> List[TimedSegment]:
+    """
+    拼接各段转录结果，丢弃与上一段末尾重叠的重复内容
+    """
+    result: List[TimedSegment] = []
+    for segments in chunks:
+        result.extend(_stitch_chunk(result[-1] if result else None, segments))
+    return result
+
+
+def _stitch_chunk(last: Optional[TimedSegment], segments: List[TimedSegment]) -> List[TimedSegment]:
+    """
+    将一段转录结果接在已输出的最后一个字幕段之后，已输出的段不再修改
+    """
+    result: List[TimedSegment] = []
+    for segment in segments:
+        if last:
+            # 切分点两侧识别出的同一句话
+            if segment.start < last.end and segment.text.strip() == last.text.strip():
+                continue
+            if segment.start < last.end:
+                if segment.words:
+                    # 按词裁掉重叠部分，文本由保留的词重建
+                    words = [w for w in segment.words if w.start >= last.end]
+                    if not words:
+                        continue
+                    segment = segment._replace(start=last.end, words=words,
+                                               text="".join(w.word for w in words))
+                elif (segment.start + segment.end) / 2 < last.end:
+                    # 无词级时间戳时无法裁剪文本，大部分重叠的段视为重复内容整段丢弃
+                    continue
+                else:
+                    segment = segment._replace(start=last.end)
+        result.append(segment)
+        last = segment
+    return result
+
+
+def transcribe_chunked(model, audio: np.ndarray, language: Optional[str], workers: int,
+                       should_stop: Callable[[], bool], **kwargs) -> Tuple[Iterator[TimedSegment], object]:
+    """
+    在静音处切分音频，多线程并行转录，按时间顺序逐段返回。
+    每段完成且之前的段都已返回后立即输出该段的字幕，调用方可以逐段写入断点，中断后从已完成的段之后继续。
+    需配合 WhisperModel(num_workers=workers) 使用，CTranslate2 推理时释放GIL，各线程可真正并行
+    :param model: WhisperModel
+    :param audio: 16000hz float32 音频
+    :param language: 语言，None 为自动检测
+    :param workers: 并行数
+    :param should_stop: 是否中断
+    :param kwargs: 透传给 model.transcribe 的参数
+    :return: (字幕段迭代器, 首段转录信息)
+    """
+    n_chunks = max(1, min(workers * 2, int(len(audio) / SAMPLE_RATE // 300)))
+    bounds = [0] + find_split_points(audio, n_chunks) + [len(audio)]
+    chunks = [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+    # 首段先行调用，以确定语言（transcribe 调用时即完成语言检测）
+    first_segments, info = model.transcribe(audio[chunks[0][0]:chunks[0][1]], language=language, **kwargs)
+    language = info.language
+    # 迭代器提前关闭时通知未完成的段尽快结束
+    closed = threading.Event()
+
+    def stopped() -> bool:
+        return closed.is_set() or should_stop()
+
+    def run(index: int) -> List[TimedSegment]:
+        start, end = chunks[index]
+        if stopped():
+            return []
+        if index == 0:
+            segments = first_segments
+        else:
+            segments, _ = model.transcribe(audio[start:end], language=language, **kwargs)
+        return _shift_segments(segments, start / SAMPLE_RATE, stopped)
+
+    def iter_segments() -> Iterator[TimedSegment]:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="autosub-asr")
+        try:
+            futures = {executor.submit(run, index): index for index in range(len(chunks))}
+            # 先完成的段暂存，等之前的段都返回后再按顺序输出
+            finished = {}
+            next_index = 0
+            last = None
+            for future in as_completed(futures):
+                finished[futures[future]] = future.result()
+                while next_index in finished:
+                    # 中断时段内结果可能不完整，不再输出
+                    if stopped():
+                        return
+                    for segment in _stitch_chunk(last, finished.pop(next_index)):
+                        last = segment
+                        yield segment
+                    next_index += 1
+        finally:
+            closed.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    return iter_segments(), info
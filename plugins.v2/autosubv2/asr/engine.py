@@ -0,0 +1,77 @@
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from plugins.autosubv2.asr.chunked import CHUNK_MIN_SECONDS, SAMPLE_RATE, TimedSegment, TimedWord, transcribe_chunked
+from plugins.autosubv2.asr.language import detect_language, detect_language_windows
+
+
+def load_model(model_path: str, compute_type: str, cpu_threads: int, num_workers: int = 1):
+    """
+    从本地目录初始化 faster-whisper 模型，不访问网络
+    """
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(
+        model_path,
+        device="cpu",
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers
+    )
+
+
+def to_timed_segment(segment) -> TimedSegment:
+    """
+    转换为可序列化的字幕段
+    """
+    return TimedSegment(float(segment.start), float(segment.end), segment.text,
+                        [TimedWord(float(w.start), float(w.end), w.word) for w in (segment.words or [])])
+
+
+class LocalEngine:
+    """
+    进程内的语音识别，封装顺序、批量、分段并行三种转录方式
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def detect_language(self, audio: np.ndarray):
+        return detect_language(self.model, audio)
+
+    def detect_language_windows(self, windows: List[np.ndarray]):
+        return detect_language_windows(self.model, windows)
+
+    def transcribe(self, audio: np.ndarray, language: Optional[str], mode: str = "sequential",
+                   workers: int = 1, batch_size: int = 8, should_stop: Callable[[], bool] = None,
+                   **kwargs) -> Tuple[str, Iterator[TimedSegment], Optional[Tuple[str, float]]]:
+        """
+        转录音频
+        :param audio: 16000hz float32 音频
+        :param language: 语言，None 为自动检测
+        :param mode: sequential / batched，顺序推理时音频超过10分钟且并行数大于1则分段并行
+        :param workers: 并行数
+        :param batch_size: 批量推理批大小
+        :param should_stop: 是否中断
+        :param kwargs: 透传给 transcribe 的参数
+        :return: (实际使用的转录方式, 字幕段迭代器, (语言, 置信度))
+        """
+        if mode == "batched":
+            try:
+                from faster_whisper import BatchedInferencePipeline
+            except ImportError:
+                mode = "sequential"
+            else:
+                segments, info = BatchedInferencePipeline(model=self.model).transcribe(
+                    audio, language=language, batch_size=batch_size, **kwargs)
+                return mode, map(to_timed_segment, segments), (info.language, info.language_probability)
+        if workers > 1 and len(audio) / SAMPLE_RATE > CHUNK_MIN_SECONDS:
+            segments, info = transcribe_chunked(self.model, audio, language=language, workers=workers,
+                                                should_stop=should_stop or (lambda: False), **kwargs)
+            return "chunked", segments, (info.language, info.language_probability)
+        segments, info = self.model.transcribe(audio, language=language, **kwargs)
+        return "sequential", map(to_timed_segment, segments), (info.language, info.language_probability)
+
+    def close(self):
+        self.model = None
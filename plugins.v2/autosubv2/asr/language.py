@@ -0,0 +1,59 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from plugins.autosubv2.asr.speech_map import SpeechMap, detect_speech_regions
+
+SAMPLE_RATE = 16000
+
+
+def sample_windows(audio: np.ndarray, count: int = 5, window_seconds: int = 30) -> List[np.ndarray]:
+    """
+    在整段音频的语音区间中均匀取样若干窗口
+    :param audio: 16000hz float32 音频
+    :param count: 窗口数
+    :param window_seconds: 窗口时长
+    """
+    speech_map = SpeechMap(detect_speech_regions(audio))
+    if not speech_map.regions:
+        speech_map = SpeechMap([(0, len(audio) / SAMPLE_RATE)])
+    window = window_seconds * SAMPLE_RATE
+    windows = []
+    for k in range(count):
+        # 按语音时长均分取样点，映射回原始时间轴
+        start = int(speech_map.to_original((k + 0.5) / count * speech_map.speech_duration) * SAMPLE_RATE)
+        start = max(0, min(start - window // 2, len(audio) - window))
+        windows.append(audio[start:start + window])
+    return windows
+
+
+def detect_language(model, audio: np.ndarray, count: int = 5) -> Optional[Tuple[str, float, Dict[str, float]]]:
+    """
+    多窗口语言检测，按各窗口语言概率求和投票
+    :param model: WhisperModel
+    :param audio: 16000hz float32 音频
+    :param count: 取样窗口数
+    :return: (语言, 置信度, 各语言得分)，模型不支持时返回None
+    """
+    return detect_language_windows(model, sample_windows(audio, count))
+
+
+def detect_language_windows(model, windows: List[np.ndarray]) -> Optional[Tuple[str, float, Dict[str, float]]]:
+    """
+    在已取样的窗口上检测语言，见 detect_language
+    """
+    if not getattr(model.model, "is_multilingual", True):
+        return "en", 1.0, {"en": 1.0}
+    if not hasattr(model, "detect_language") or not windows:
+        return None
+    scores = defaultdict(float)
+    for window in windows:
+        _, _, all_probs = model.detect_language(audio=window)
+        for lang, prob in all_probs:
+            scores[lang] += prob / len(windows)
+    if not scores:
+        return None
+    lang = max(scores, key=scores.get)
+    top = dict(sorted(scores.items(), key=lambda x: x[1], reverse=True)[:3])
+    return lang, scores[lang], top
@@ -0,0 +1,231 @@
+import gc
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional
+
+from app.log import logger
+
+
+class ModelKey(NamedTuple):
+    """
+    模型池键：同一模型在不同计算精度、线程数、并行数、运行方式（进程内/独立进程）下需要分别加载
+    """
+    model: str
+    compute_type: str
+    cpu_threads: int
+    num_workers: int = 1
+    isolated: bool = False
+
+
+class _PoolEntry:
+    def __init__(self):
+        self.model = None
+        self.error: Optional[Exception] = None
+        self.loaded = threading.Event()
+        self.in_use = 0
+        self.last_used = time.time()
+        # 模型文件已更新，归还后释放；reload 为释放后重新加载所用的函数
+        self.stale = False
+        self.reload: Optional[Callable[[ModelKey], Any]] = None
+
+
+class WhisperModelPool:
+    """
+    faster-whisper 模型池，在多个任务之间复用已加载的模型，空闲超时后自动释放
+    """
+
+    def __init__(self, idle_timeout: float = 1800):
+        self._entries: Dict[ModelKey, _PoolEntry] = {}
+        self._lock = threading.Lock()
+        self._idle_timeout = idle_timeout
+        self._reaper = None
+
+    def set_idle_timeout(self, seconds: float):
+        """
+        设置空闲释放时间，小于等于0时任务结束后立即释放
+        """
+        self._idle_timeout = seconds
+
+    def preload(self, key: ModelKey, loader: Callable[[ModelKey], Any]):
+        """
+        在后台线程中预加载模型
+        :param key: 模型键
+        :param loader: 模型加载函数
+        """
+        with self._lock:
+            if key in self._entries:
+                return
+            entry = self._entries[key] = _PoolEntry()
+        threading.Thread(target=self.__load, args=(key, entry, loader), daemon=True).start()
+
+    def acquire(self, key: ModelKey, loader: Callable[[ModelKey], Any]):
+        """
+        获取模型，模型未加载时在当前线程加载，正在后台加载时等待加载完成
+        :return: 上下文管理器，退出时归还模型
+        """
+        return _ModelLease(self, key, loader)
+
+    def retain_only(self, keys: Iterable[ModelKey]):
+        """
+        释放不在指定列表中的空闲模型，用于配置变更后清理旧模型
+        """
+        keys = set(keys)
+        with self._lock:
+            stale = [(key, self._entries.pop(key)) for key, entry in list(self._entries.items())
+                     if key not in keys and entry.in_use == 0 and entry.loaded.is_set()]
+        for key, entry in stale:
+            self.__release(key, entry)
+
+    def refresh(self, key: ModelKey, loader: Callable[[ModelKey], Any]):
+        """
+        模型文件更新后重新加载：空闲模型立即释放，正在使用或加载中的模型在归还后释放，
+        指定键的模型随后在后台通过 loader 重新加载
+        :param key: 需要重新加载的模型键
+        :param loader: 模型加载函数
+        """
+        with self._lock:
+            idle = []
+            for k, entry in list(self._entries.items()):
+                if entry.in_use == 0 and entry.loaded.is_set():
+                    idle.append((k, self._entries.pop(k)))
+                else:
+                    entry.stale = True
+            pending = self._entries.get(key)
+            if pending:
+                pending.reload = loader
+        for k, entry in idle:
+            self.__release(k, entry)
+        if pending:
+            logger.info(f"faster-whisper 模型 {key.model} 正在使用，将在当前任务结束后更新")
+        else:
+            self.preload(key, loader)
+
+    def clear(self):
+        """
+        释放全部空闲模型
+        """
+        self.retain_only([])
+
+    def __load(self, key: ModelKey, entry: _PoolEntry, loader: Callable[[ModelKey], Any]):
+        try:
+            start = time.time()
+            logger.info(f"正在加载 faster-whisper 模型：{key.model}, {key.compute_type}, 线程数 {key.cpu_threads}, 并行数 {key.num_workers}")
+            entry.model = loader(key)
+            logger.info(f"faster-whisper 模型加载完成，耗时 {round(time.time() - start, 2)}秒")
+        except Exception as e:
+            logger.error(f"faster-whisper 模型加载失败：{e}")
+            entry.error = e
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+        finally:
+            entry.last_used = time.time()
+            entry.loaded.set()
+        self.__settle(key, entry)
+        self.__ensure_reaper()
+
+    def _checkout(self, key: ModelKey, loader: Callable[[ModelKey], Any]):
+        with self._lock:
+            entry = self._entries.get(key)
+            load_here = entry is None
+            if load_here:
+                entry = self._entries[key] = _PoolEntry()
+            entry.in_use += 1
+        if load_here:
+            self.__load(key, entry, loader)
+        else:
+            entry.loaded.wait()
+        if entry.error:
+            with self._lock:
+                entry.in_use -= 1
+            self.__settle(key, entry)
+            raise entry.error
+        return entry
+
+    def _checkin(self, key: ModelKey, entry: _PoolEntry):
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = time.time()
+        self.__settle(key, entry)
+
+    def __settle(self, key: ModelKey, entry: _PoolEntry):
+        """
+        模型不再使用时按需释放，并执行推迟的重新加载
+        """
+        fresh = None
+        with self._lock:
+            if entry.in_use or not entry.loaded.is_set():
+                return
+            evicted = False
+            if self._entries.get(key) is entry:
+                # 识别进程崩溃、超出内存上限或模型文件已更新时立即释放，下次使用时重新加载
+                if entry.stale or self._idle_timeout <= 0 or not getattr(entry.model, "reusable", True):
+                    del self._entries[key]
+                    evicted = True
+            elif not entry.error:
+                return
+            # 替换为新条目时持有锁，避免其他任务在此期间以普通方式加载而跳过更新
+            if entry.reload and key not in self._entries:
+                fresh = self._entries[key] = _PoolEntry()
+            reload, entry.reload = entry.reload, None
+        if evicted:
+            self.__release(key, entry)
+        if fresh:
+            threading.Thread(target=self.__load, args=(key, fresh, reload), daemon=True).start()
+
+    def __release(self, key: ModelKey, entry: _PoolEntry):
+        """
+        释放已从池中移除的模型。关闭模型或结束识别进程可能较慢，不能持有锁，避免阻塞其他任务获取模型
+        """
+        close = getattr(entry.model, "close", None)
+        if close:
+            try:
+                close()
+            except Exception as e:
+                logger.warn(f"释放模型失败：{e}")
+        entry.model = None
+        gc.collect()
+        logger.info(f"已释放 faster-whisper 模型：{key.model}, {key.compute_type}, 线程数 {key.cpu_threads}, 并行数 {key.num_workers}")
+
+    def __ensure_reaper(self):
+        with self._lock:
+            if self._reaper and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self.__reap, daemon=True)
+            self._reaper.start()
+
+    def __reap(self):
+        while True:
+            time.sleep(30)
+            with self._lock:
+                now = time.time()
+                idle = [(key, self._entries.pop(key)) for key, entry in list(self._entries.items())
+                        if entry.in_use == 0 and entry.loaded.is_set()
+                        and now - entry.last_used > max(self._idle_timeout, 0)]
+                stop = not self._entries
+                if stop:
+                    self._reaper = None
+            for key, entry in idle:
+                self.__release(key, entry)
+            if stop:
+                return
+
+
+class _ModelLease:
+    def __init__(self, pool: WhisperModelPool, key: ModelKey, loader: Callable[[ModelKey], Any]):
+        self._pool = pool
+        self._key = key
+        self._loader = loader
+        self._entry = None
+
+    def __enter__(self):
+        self._entry = self._pool._checkout(self._key, self._loader)
+        return self._entry.model
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._pool._checkin(self._key, self._entry)
+        return False
+
+
+# 模型池在插件重载之间共享
+whisper_model_pool = WhisperModelPool()
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.log import logger
+
+
+class ModelRegistry:
+    """
+    本地 faster-whisper 模型仓库。
+    模型下载完成后记录文件清单（大小、sha256），之后加载只校验本地文件，不访问网络
+    """
+    MANIFEST = "manifest.json"
+
+    _lock = threading.RLock()
+    # 本进程内已完成完整哈希校验的模型
+    _verified = set()
+
+    def __init__(self, root: os.PathLike):
+        self._root = Path(root)
+
+    def model_dir(self, model: str) -> Path:
+        return self._root / model.replace("/", "--")
+
+    def manifest(self, model: str) -> Optional[dict]:
+        manifest_file = self.model_dir(model) / self.MANIFEST
+        if not manifest_file.exists():
+            return None
+        try:
+            return json.loads(manifest_file.read_text(encoding="utf8"))
+        except Exception as e:
+            logger.warn(f"读取模型清单失败：{manifest_file}, {e}")
+            return None
+
+    def resolve(self, model: str) -> Optional[str]:
+        """
+        获取本地模型路径，模型不存在或校验失败时返回None。不访问网络
+        :param model: 模型名称
+        :return: 模型目录
+        """
+        manifest = self.manifest(model) or self.__adopt_cache(model)
+        if not manifest:
+            return None
+        full = model not in self._verified
+        if not self.__verify(manifest, full=full):
+            logger.warn(f"模型 {model} 本地文件校验失败，需要重新下载")
+            return None
+        if full:
+            self._verified.add(model)
+        return manifest["path"]
+
+    def download(self, model: str, force: bool = False) -> Optional[str]:
+        """
+        下载或更新模型。先下载到临时目录，校验并生成清单后再替换正式目录
+        :param model: 模型名称
+        :param force: 已存在时是否重新下载
+        :return: 模型目录
+        """
+        from faster_whisper import download_model
+
+        with self._lock:
+            if not force:
+                path = self.resolve(model)
+                if path:
+                    return path
+            target = self.model_dir(model)
+            staging = target.with_name(target.name + ".downloading")
+            shutil.rmtree(staging, ignore_errors=True)
+            staging.mkdir(parents=True, exist_ok=True)
+            logger.info(f"开始下载 faster-whisper 模型 '{model}' ...")
+            download_model(model, output_dir=str(staging), cache_dir=str(self._root / "cache"))
+            self.__write_manifest(staging, model, files_dir=staging, path=target)
+            shutil.rmtree(target, ignore_errors=True)
+            os.replace(staging, target)
+            self._verified.add(model)
+            logger.info(f"faster-whisper 模型 '{model}' 下载完成：{target}")
+            return str(target)
+
+    def __adopt_cache(self, model: str) -> Optional[dict]:
+        """
+        登记旧版本下载到 HuggingFace 缓存目录中的模型，避免重复下载
+        """
+        try:
+            from faster_whisper import download_model
+            path = download_model(model, local_files_only=True, cache_dir=str(self._root / "cache"))
+        except Exception:
+            return None
+        if not path or not os.path.isdir(path):
+            return None
+        logger.info(f"登记已缓存的 faster-whisper 模型 '{model}'：{path}")
+        with self._lock:
+            target = self.model_dir(model)
+            target.mkdir(parents=True, exist_ok=True)
+            manifest = self.__write_manifest(target, model, files_dir=Path(path), path=Path(path))
+        self._verified.add(model)
+        return manifest
+
+    def __write_manifest(self, manifest_dir: Path, model: str, files_dir: Path, path: Path) -> dict:
+        files: Dict[str, dict] = {}
+        for file in sorted(files_dir.rglob("*")):
+            if not file.is_file() or file.name == self.MANIFEST or ".cache" in file.parts:
+                continue
+            files[file.relative_to(files_dir).as_posix()] = {
+                "size": file.stat().st_size,
+                "sha256": self.__sha256(file),
+            }
+        manifest = {
+            "model": model,
+            "path": str(path),
+            "files": files,
+            "created": datetime.now().isoformat(),
+        }
+        (manifest_dir / self.MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf8")
+        return manifest
+
+    def __verify(self, manifest: dict, full: bool) -> bool:
+        """
+        校验模型文件，默认只比较文件大小，full 时同时比较哈希
+        """
+        root = Path(manifest.get("path") or "")
+        files = manifest.get("files") or {}
+        if not files:
+            return False
+        for name, meta in files.items():
+            file = root / name
+            if not file.is_file() or file.stat().st_size != meta.get("size"):
+                return False
+            if full and self.__sha256(file) != meta.get("sha256"):
+                return False
+        return True
+
+    @staticmethod
+    def __sha256(file: Path) -> str:
+        sha = hashlib.sha256()
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(block)
+        return sha.hexdigest()
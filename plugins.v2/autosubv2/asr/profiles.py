@@ -0,0 +1,54 @@
+from typing import Any, Dict, Tuple
+
+# 语音识别速度/质量档位
+ASR_PROFILES: Dict[str, Dict[str, Any]] = {
+    "fast": {
+        "compute_type": "int8",
+        "beam_size": 1,
+        "best_of": 1,
+        "temperature": 0,
+        "condition_on_previous_text": False,
+        "vad_parameters": {"min_silence_duration_ms": 1000, "speech_pad_ms": 200},
+    },
+    "balanced": {
+        # 使用性能校准结果，未校准时为 int8
+        "compute_type": "auto",
+        "beam_size": 5,
+        "best_of": 5,
+        "temperature": 0,
+        "condition_on_previous_text": True,
+        "vad_parameters": {"min_silence_duration_ms": 2000, "speech_pad_ms": 400},
+    },
+    "accurate": {
+        "compute_type": "float32",
+        "beam_size": 5,
+        "best_of": 5,
+        "temperature": [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+        "condition_on_previous_text": True,
+        "vad_parameters": {"min_silence_duration_ms": 500, "speech_pad_ms": 400},
+    },
+}
+
+DEFAULT_PROFILE = "balanced"
+
+
+def get_profile(name: str) -> Dict[str, Any]:
+    """
+    获取档位配置，未知档位返回默认档位
+    """
+    return ASR_PROFILES.get(name) or ASR_PROFILES[DEFAULT_PROFILE]
+
+
+def build_transcribe_options(name: str, word_timestamps: bool) -> Tuple[str, Dict[str, Any]]:
+    """
+    根据档位生成模型计算精度和 transcribe 参数
+    :param name: 档位名称
+    :param word_timestamps: 是否需要单词级时间戳
+    :return: (compute_type, transcribe 参数)
+    """
+    profile = dict(get_profile(name))
+    compute_type = profile.pop("compute_type")
+    profile["vad_parameters"] = dict(profile["vad_parameters"])
+    profile["vad_filter"] = True
+    profile["word_timestamps"] = word_timestamps
+    return compute_type, profile
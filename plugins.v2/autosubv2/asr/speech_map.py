@@ -0,0 +1,120 @@
+import bisect
+import json
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def _frames(audio: np.ndarray, frame_ms: int) -> np.ndarray:
+    frame = SAMPLE_RATE * frame_ms // 1000
+    count = len(audio) // frame
+    return audio[:count * frame].reshape(count, frame)
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """
+    连续为 True 的区间，返回 [[start, end), ...] 帧序号
+    """
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges.reshape(-1, 2)
+
+
+def detect_speech_regions(audio: np.ndarray,
+                          frame_ms: int = 30,
+                          threshold_db: float = 12,
+                          min_speech_ms: int = 250,
+                          min_silence_ms: int = 1500,
+                          pad_ms: int = 400) -> List[Tuple[float, float]]:
+    """
+    基于帧能量和过零率的语音区间检测。
+    能量高于底噪一定分贝且过零率有起伏（清浊音交替）的帧视为语音，
+    持续平稳的配乐和静音被过滤，判断从宽，宁可多保留
+    :param audio: 16000hz float32 音频
+    :return: 语音区间列表（秒）
+    """
+    frames = _frames(audio, frame_ms)
+    if len(frames) == 0:
+        return []
+    energy_db = 10 * np.log10(np.mean(np.square(frames), axis=1) + 1e-10)
+    zcr = np.mean(np.abs(np.diff(np.signbit(frames).astype(np.int8), axis=1)), axis=1)
+
+    noise_floor = np.percentile(energy_db, 10)
+    loud = energy_db > max(noise_floor + threshold_db, -60)
+
+    # 1秒窗口内过零率的标准差，语音清浊音交替时较大，持续的乐音较小
+    window = max(1, 1000 // frame_ms)
+    kernel = np.ones(window) / window
+    zcr_mean = np.convolve(zcr, kernel, mode="same")
+    zcr_std = np.sqrt(np.maximum(np.convolve(np.square(zcr), kernel, mode="same") - np.square(zcr_mean), 0))
+    speech = loud & (zcr_std > 0.015)
+
+    # 填补短暂停顿
+    for start, end in _runs(~speech):
+        if start > 0 and end < len(speech) and (end - start) * frame_ms < min_silence_ms:
+            speech[start:end] = True
+
+    regions = []
+    duration = len(audio) / SAMPLE_RATE
+    pad = pad_ms / 1000
+    for start, end in _runs(speech):
+        if (end - start) * frame_ms < min_speech_ms:
+            continue
+        begin = max(0.0, float(start) * frame_ms / 1000 - pad)
+        finish = min(duration, float(end) * frame_ms / 1000 + pad)
+        if regions and begin <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], finish)
+        else:
+            regions.append((begin, finish))
+    return regions
+
+
+class SpeechMap:
+    """
+    语音区间映射：截取语音区间拼接成短音频，并将转录时间戳映射回原始时间轴
+    """
+
+    def __init__(self, regions: List[Tuple[float, float]]):
+        self.regions = [(float(start), float(end)) for start, end in regions]
+        # 各区间在拼接音频中的起始时间
+        self._offsets = []
+        total = 0.0
+        for start, end in self.regions:
+            self._offsets.append(total)
+            total += end - start
+        self.speech_duration = total
+
+    def extract(self, audio: np.ndarray) -> np.ndarray:
+        """
+        拼接语音区间音频
+        """
+        if not self.regions:
+            return audio[:0]
+        return np.concatenate([audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+                               for start, end in self.regions])
+
+    def to_original(self, seconds: float) -> float:
+        """
+        拼接音频中的时间 -> 原始音频中的时间
+        """
+        if not self.regions:
+            return seconds
+        index = max(0, bisect.bisect_right(self._offsets, seconds) - 1)
+        start, end = self.regions[index]
+        return min(start + seconds - self._offsets[index], end)
+
+    def save(self, file: Path):
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(json.dumps({"regions": self.regions}), encoding="utf8")
+
+    @staticmethod
+    def load(file: Path) -> Optional["SpeechMap"]:
+        if not file.exists():
+            return None
+        try:
+            return SpeechMap(json.loads(file.read_text(encoding="utf8"))["regions"])
+        except Exception:
+            return None
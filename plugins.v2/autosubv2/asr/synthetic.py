@@ -0,0 +1,17 @@
+SAMPLE_RATE = 16000
+
+
+def synth_clip(seconds: int = 30):
+    """
+    生成类语音的测试音频：带音节节奏调幅的谐波 + 噪声
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    t = np.arange(seconds * SAMPLE_RATE, dtype=np.float32) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.2 * t) > -0.5)
+    audio = 0.3 * voice * envelope + 0.01 * rng.standard_normal(len(t))
+    return audio.astype(np.float32)
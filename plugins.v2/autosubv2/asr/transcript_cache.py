@@ -0,0 +1,170 @@
+import json
+import shutil
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+import numpy as np
+import srt
+
+SAMPLE_RATE = 16000
+# 指纹帧长（毫秒），决定时间偏移的精度
+FRAME_MS = 100
+
+
+def fingerprint(audio: np.ndarray) -> np.ndarray:
+    """
+    音频指纹：按帧计算对数能量包络。
+    同一音轨经过不同编码（WEB-DL / BluRay）后解码数据逐字节不同，但能量包络高度相关
+    :param audio: 16000hz float32 音频
+    :return: 每帧对数能量
+    """
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    count = len(audio) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    energy = np.zeros(count, dtype=np.float32)
+    # 分块计算，避免为整段音频创建平方后的副本
+    step = 6000
+    for i in range(0, count, step):
+        frames = audio[i * frame:min(count, i + step) * frame].reshape(-1, frame)
+        energy[i:i + len(frames)] = np.log10(np.sqrt(np.mean(np.square(frames), axis=1)) + 1e-3)
+    return energy
+
+
+def align(cached: np.ndarray, current: np.ndarray, max_offset: float = 60) -> Tuple[float, float]:
+    """
+    在 ±max_offset 秒范围内寻找两个指纹的最佳对齐位置
+    :return: (相关系数, 时间偏移秒数)，当前音频时间 = 缓存时间 + 偏移
+    """
+    max_lag = int(max_offset * 1000 / FRAME_MS)
+    best_score, best_lag = -1.0, 0
+    for lag in range(-max_lag, max_lag + 1):
+        if lag >= 0:
+            a, b = cached, current[lag:]
+        else:
+            a, b = cached[-lag:], current
+        n = min(len(a), len(b))
+        # 重叠部分不足较短音频的90%时不参与比较
+        if n < 0.9 * min(len(cached), len(current)) or n < 100:
+            continue
+        a, b = a[:n], b[:n]
+        a = a - a.mean()
+        b = b - b.mean()
+        denominator = np.sqrt(np.dot(a, a) * np.dot(b, b))
+        if denominator <= 0:
+            continue
+        score = float(np.dot(a, b) / denominator)
+        if score > best_score:
+            best_score, best_lag = score, lag
+    return best_score, best_lag * FRAME_MS / 1000
+
+
+class TranscriptCache:
+    """
+    按音频内容索引的转录结果缓存。同一集的不同版本（WEB-DL、BluRay、Repack）音轨相同，命中时直接复用字幕，
+    仅修正整体时间偏移
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, root: Path, max_entries: int = 500, threshold: float = 0.9):
+        self._root = Path(root)
+        self._index_file = self._root / "index.json"
+        self._max_entries = max_entries
+        self._threshold = threshold
+
+    def lookup(self, audio_fingerprint: np.ndarray, models: List[str], profile: str,
+               lang: str = None) -> Optional[Tuple[str, List[srt.Subtitle], dict, float]]:
+        """
+        查找同一音轨的转录结果
+        :param audio_fingerprint: 音频指纹
+        :param models: 可接受的模型，按优先级排列
+        :param profile: 识别档位
+        :param lang: 音频语言。同一集的配音版与原版共用音乐和音效，能量包络可能高度相关，语言未知时不复用
+        :return: (字幕语言, 修正偏移后的字幕, 缓存条目, 偏移秒数)
+        """
+        if not lang or lang == 'auto':
+            return None
+        duration = len(audio_fingerprint) * FRAME_MS / 1000
+        with self._lock:
+            index = self.__load_index()
+        candidates = [entry for entry in index
+                      if entry["model"] in models and entry["profile"] == profile
+                      and entry["lang"] == lang
+                      and abs(entry["duration"] - duration) <= 60]
+        candidates.sort(key=lambda entry: models.index(entry["model"]))
+        for entry in candidates:
+            entry_dir = self._root / entry["id"]
+            try:
+                cached = np.load(entry_dir / "fingerprint.npy").astype(np.float32)
+            except (OSError, ValueError):
+                continue
+            score, offset = align(cached, audio_fingerprint)
+            if score < self._threshold:
+                continue
+            with open(entry_dir / "transcript.srt", encoding="utf8") as f:
+                subs = list(srt.parse(f.read()))
+            self.__touch(entry["id"])
+            return entry["lang"], self.__shift(subs, offset, duration), dict(entry, score=round(score, 4)), offset
+        return None
+
+    def store(self, audio_fingerprint: np.ndarray, model: str, profile: str, lang: str,
+              subs: List[srt.Subtitle]):
+        """
+        保存转录结果，超过最大条目数时删除最久未使用的条目
+        """
+        entry_id = uuid4().hex
+        entry_dir = self._root / entry_id
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        np.save(entry_dir / "fingerprint.npy", audio_fingerprint.astype(np.float16))
+        with open(entry_dir / "transcript.srt", "w", encoding="utf8") as f:
+            f.write(srt.compose(subs))
+        with self._lock:
+            index = self.__load_index()
+            index.append({"id": entry_id, "model": model, "profile": profile, "lang": lang,
+                          "duration": len(audio_fingerprint) * FRAME_MS / 1000, "used": time.time()})
+            index.sort(key=lambda entry: entry["used"])
+            while len(index) > self._max_entries:
+                shutil.rmtree(self._root / index.pop(0)["id"], ignore_errors=True)
+            self.__save_index(index)
+
+    @staticmethod
+    def __shift(subs: List[srt.Subtitle], offset: float, duration: float) -> List[srt.Subtitle]:
+        if not offset:
+            return subs
+        delta = timedelta(seconds=offset)
+        shifted = []
+        for sub in subs:
+            start, end = sub.start + delta, sub.end + delta
+            if end.total_seconds() <= 0 or start.total_seconds() >= duration:
+                continue
+            shifted.append(srt.Subtitle(index=len(shifted) + 1, start=max(start, timedelta(0)), end=end,
+                                        content=sub.content))
+        return shifted
+
+    def __touch(self, entry_id: str):
+        with self._lock:
+            index = self.__load_index()
+            for entry in index:
+                if entry["id"] == entry_id:
+                    entry["used"] = time.time()
+            self.__save_index(index)
+
+    def __load_index(self) -> List[dict]:
+        if not self._index_file.exists():
+            return []
+        try:
+            with open(self._index_file, encoding="utf8") as f:
+                return json.load(f)
+        except ValueError:
+            return []
+
+    def __save_index(self, index: List[dict]):
+        self._root.mkdir(parents=True, exist_ok=True)
+        tmp_file = self._index_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf8") as f:
+            json.dump(index, f)
+        tmp_file.replace(self._index_file)
@@ -0,0 +1,77 @@
+from array import array
+from datetime import timedelta
+from typing import List
+
+import srt
+from lxml import etree
+
+END_TOKENS = ('.', '!', '?', '。', '！', '？', '。"', '！"', '？"', '."', '!"', '?"')
+NOISY_TOKENS = [('(', ')'), ('[', ']'), ('{', '}'), ('【', '】'), ('♪', '♪'), ('♫', '♫'), ('♪♪', '♪♪')]
+
+
+def is_noisy_subtitle(content: str) -> bool:
+    """
+    判断是否为背景音等字幕
+    """
+    return any(content.startswith(t[0]) and content.endswith(t[1]) for t in NOISY_TOKENS)
+
+
+class StreamingWordMerger:
+    """
+    流式整句合并：逐个输入单词（或字幕行），按句末标点或长度合并为整句。
+    起止时间存放在 array 中，不为每个单词创建 srt.Subtitle
+    """
+
+    def __init__(self, max_length: int = 80):
+        self._max_length = max_length
+        self._starts = array('d')
+        self._ends = array('d')
+        self._texts: List[str] = []
+        self._sentence_end = True
+
+    def __len__(self):
+        return len(self._texts)
+
+    def feed(self, start: float, end: float, text: str):
+        """
+        输入一个单词或一行字幕
+        :param start: 开始时间（秒）
+        :param end: 结束时间（秒）
+        :param text: 内容
+        """
+        # 先将多行合并为一行，再去除首尾空格
+        content = text.replace('\n', ' ').strip()
+        # 去除html标签，仅在可能包含标签或实体时解析
+        if '<' in content or '&' in content:
+            parse = etree.HTML(content)
+            if parse is not None:
+                content = parse.xpath('string(.)')
+        if content == '':
+            return
+
+        # 背景音等字幕，单独成句
+        if is_noisy_subtitle(content):
+            self.__append(start, end, content)
+            self._sentence_end = True
+            return
+
+        if self._sentence_end:
+            self.__append(start, end, content)
+        else:
+            self._texts[-1] = f"{self._texts[-1]} {content}"
+            self._ends[-1] = end
+
+        # 以标志符结尾或超过一定长度时，语句终结
+        self._sentence_end = content.endswith(END_TOKENS) or len(self._texts[-1]) > self._max_length
+
+    def __append(self, start: float, end: float, content: str):
+        self._starts.append(start)
+        self._ends.append(end)
+        self._texts.append(content)
+
+    def to_subtitles(self) -> List[srt.Subtitle]:
+        return [srt.Subtitle(index=i + 1,
+                             start=timedelta(seconds=self._starts[i]),
+                             end=timedelta(seconds=self._ends[i]),
+                             content=self._texts[i])
+                for i in range(len(self._texts))]
@@ -0,0 +1,203 @@
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+import psutil
+
+from app.log import logger
+from plugins.autosubv2.asr.worker_process import read_message, write_audio, write_message
+
+
+class WorkerCrashed(Exception):
+    """识别进程异常退出或被终止"""
+    pass
+
+
+class AsrWorker:
+    """
+    运行在独立进程中的 faster-whisper 模型，接口与 LocalEngine 一致。
+    模型内存只占用子进程，停止任务时直接终止进程，进程崩溃或超出内存上限时由模型池释放，下次使用时重新启动
+    """
+    # 内存上限（字节），0为不限制
+    memory_limit = 0
+
+    @classmethod
+    def set_memory_limit(cls, mb: int):
+        cls.memory_limit = max(0, int(mb or 0)) * 1024 * 1024
+
+    def __init__(self, model_path: str, compute_type: str, cpu_threads: int, num_workers: int = 1):
+        self._kill_reason = None
+        self._should_stop: Optional[Callable[[], bool]] = None
+        self._stderr = deque(maxlen=20)
+        self._process = subprocess.Popen([sys.executable, str(Path(__file__).with_name("worker_process.py"))],
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        threading.Thread(target=self.__drain_stderr, daemon=True).start()
+        threading.Thread(target=self.__watch, daemon=True).start()
+        try:
+            self.__send(("load", model_path, compute_type, cpu_threads, num_workers))
+            pid = self.__receive()[1]
+        except Exception:
+            self.close()
+            raise
+        logger.info(f"语音识别进程已启动，PID {pid}，内存占用 {self.memory() // 1024 // 1024}MB")
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None and not self._kill_reason
+
+    @property
+    def reusable(self) -> bool:
+        """
+        进程存活且未超出内存上限时可继续复用
+        """
+        return self.alive and not (self.memory_limit and self.memory() > self.memory_limit)
+
+    def memory(self) -> int:
+        """
+        识别进程常驻内存（字节）
+        """
+        try:
+            return psutil.Process(self._process.pid).memory_info().rss
+        except psutil.Error:
+            return 0
+
+    def detect_language(self, audio):
+        from plugins.autosubv2.asr.language import sample_windows
+
+        # 在主进程取样，只传输检测用的几个窗口
+        self.__send(("detect", sample_windows(audio)))
+        return self.__receive()[1]
+
+    def transcribe(self, audio, language: Optional[str], should_stop: Callable[[], bool] = None,
+                   **options) -> Tuple[str, Iterator, Optional[Tuple[str, float]]]:
+        """
+        转录音频，参数同 LocalEngine.transcribe。
+        转录期间 should_stop 返回真时立即终止识别进程
+        """
+        self._should_stop = should_stop or (lambda: False)
+        try:
+            self.__send(("transcribe", len(audio), language, options))
+            self.__send_audio(audio)
+            _, mode, info = self.__receive()
+        except Exception:
+            self._should_stop = None
+            raise
+        return mode, _RemoteSegments(self), info
+
+    def close(self):
+        """
+        结束识别进程
+        """
+        if self._process.poll() is None:
+            try:
+                self.__send(("exit",))
+                self._process.wait(timeout=3)
+            except Exception:
+                self._process.kill()
+                self._process.wait()
+        logger.info(f"语音识别进程已退出")
+
+    def _next_segment(self):
+        message = self.__receive()
+        if message[0] == "segment":
+            return message[1]
+        self._should_stop = None
+        return None
+
+    def _abort(self, reason: str):
+        """
+        终止进程，用于转录未读取完毕时丢弃进程中的剩余输出
+        """
+        self._should_stop = None
+        self.__kill(reason)
+
+    def __send_audio(self, audio):
+        """
+        通过管道分块发送音频
+        """
+        try:
+            write_audio(self._process.stdin, audio)
+        except (OSError, ValueError):
+            raise WorkerCrashed(self.__exit_reason())
+
+    def __send(self, message):
+        try:
+            write_message(self._process.stdin, message)
+        except (OSError, ValueError):
+            raise WorkerCrashed(self.__exit_reason())
+
+    def __receive(self):
+        try:
+            message = read_message(self._process.stdout)
+        except (OSError, ValueError, EOFError):
+            message = None
+        if message is None:
+            raise WorkerCrashed(self.__exit_reason())
+        if message[0] == "error":
+            logger.debug(message[2])
+            raise RuntimeError(message[1])
+        return message
+
+    def __exit_reason(self) -> str:
+        if self._kill_reason:
+            return self._kill_reason
+        code = self._process.wait()
+        output = "\n".join(self._stderr)
+        return f"语音识别进程异常退出，退出码 {code}" + (f"：\n{output}" if output else "")
+
+    def __kill(self, reason: str):
+        if self._process.poll() is None:
+            self._kill_reason = reason
+            self._process.kill()
+
+    def __watch(self):
+        """
+        转录期间检查是否需要停止和内存占用
+        """
+        while self._process.poll() is None:
+            time.sleep(0.5)
+            should_stop = self._should_stop
+            if should_stop is None:
+                continue
+            if should_stop():
+                self.__kill("任务已停止")
+            elif self.memory_limit and self.memory() > self.memory_limit:
+                self.__kill(f"语音识别进程内存占用超过上限 {self.memory_limit // 1024 // 1024}MB")
+
+    def __drain_stderr(self):
+        for line in iter(self._process.stderr.readline, b""):
+            line = line.decode("utf8", errors="replace").rstrip()
+            if line:
+                self._stderr.append(line)
+                logger.debug(f"[asr] {line}")
+
+
+class _RemoteSegments:
+    """
+    逐段读取识别进程的输出。未读取完毕就关闭时终止识别进程，避免残留输出干扰后续任务
+    """
+
+    def __init__(self, worker: AsrWorker):
+        self._worker = worker
+        self._finished = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._finished:
+            raise StopIteration
+        segment = self._worker._next_segment()
+        if segment is None:
+            self._finished = True
+            raise StopIteration
+        return segment
+
+    def close(self):
+        if not self._finished:
+            self._finished = True
+            self._worker._abort("转录未完成")
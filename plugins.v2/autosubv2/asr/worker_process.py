@@ -0,0 +1,115 @@
+"""
+独立的语音识别进程，由 worker.py 启动，通过标准输入输出交换消息。
+进程中不导入插件主模块和 MoviePilot，崩溃或被终止不影响主进程
+"""
+import os
+import pickle
+import struct
+import sys
+import traceback
+import types
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+_HEADER = struct.Struct("<I")
+
+
+def read_message(stream: BinaryIO) -> Optional[Any]:
+    """
+    读取一条消息，对端关闭时返回None
+    """
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    size, = _HEADER.unpack(header)
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return pickle.loads(data)
+
+
+def write_message(stream: BinaryIO, message: Any):
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(_HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def read_audio(stream: BinaryIO, samples: int):
+    """
+    读取 write_audio 分块发送的音频
+    :return: 16000hz float32 音频
+    """
+    import numpy as np
+
+    audio = np.empty(samples, dtype=np.float32)
+    received = 0
+    while received < samples:
+        message = read_message(stream)
+        if message is None:
+            raise EOFError("音频未传输完整")
+        chunk = np.frombuffer(message[1], dtype=np.int16)
+        audio[received:received + len(chunk)] = chunk.astype(np.float32) / 32768.0
+        received += len(chunk)
+    return audio
+
+
+def write_audio(stream: BinaryIO, audio, chunk_samples: int = 2 * 1024 * 1024):
+    """
+    按块发送 16 位 PCM，与 ffmpeg 解码输出的精度一致，数据量为 float32 的一半，且不需要临时文件
+    """
+    import numpy as np
+
+    for start in range(0, len(audio), chunk_samples):
+        chunk = np.clip(np.rint(audio[start:start + chunk_samples] * 32768.0), -32768, 32767).astype(np.int16)
+        write_message(stream, ("pcm", chunk.tobytes()))
+
+
+def _bootstrap():
+    """
+    注册 plugins.autosubv2 包路径但不执行其 __init__，使 asr 下的模块可按原名导入，消息中的对象可直接反序列化
+    """
+    asr_dir = Path(__file__).resolve().parent
+    for name, path in (("plugins", asr_dir.parent.parent), ("plugins.autosubv2", asr_dir.parent)):
+        if name not in sys.modules:
+            module = types.ModuleType(name)
+            module.__path__ = [str(path)]
+            sys.modules[name] = module
+
+
+def main():
+    _bootstrap()
+    from plugins.autosubv2.asr.engine import LocalEngine, load_model
+
+    reader = sys.stdin.buffer
+    writer = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    # 第三方库的输出转到标准错误，避免混入消息通道
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    engine = None
+    while True:
+        message = read_message(reader)
+        if message is None or message[0] == "exit":
+            break
+        op, args = message[0], message[1:]
+        try:
+            if op == "load":
+                engine = LocalEngine(load_model(*args))
+                write_message(writer, ("ok", os.getpid()))
+            elif op == "detect":
+                # 主进程只发送取样窗口
+                write_message(writer, ("ok", engine.detect_language_windows(args[0])))
+            elif op == "transcribe":
+                samples, language, options = args
+                mode, segments, info = engine.transcribe(read_audio(reader, samples), language, **options)
+                write_message(writer, ("info", mode, info))
+                for segment in segments:
+                    write_message(writer, ("segment", segment))
+                write_message(writer, ("ok", None))
+            else:
+                write_message(writer, ("error", f"unknown op: {op}", ""))
+        except Exception as e:
+            write_message(writer, ("error", f"{type(e).__name__}: {e}", traceback.format_exc()))
+
+
+if __name__ == "__main__":
+    main()
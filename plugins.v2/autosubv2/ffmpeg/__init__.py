@@ -1,50 +1,118 @@
 import json
-import subprocess
+import threading
+from typing import Optional
+
+from app.log import logger
+from plugins.autosubv2.ffmpeg.runner import ProcessCancelled, ProcessResult, ProcessRunner, ProcessTimeout, \
+    media_timeout
+from plugins.autosubv2.ffmpeg.scheduler import io_scheduler
+
+# ffprobe 只读取容器头，超过该时长视为挂起（如失效的网络挂载）
+PROBE_TIMEOUT = 60
 
 
 class Ffmpeg:
 
+    def __init__(self, cancel_event: Optional[threading.Event] = None):
+        """
+        :param cancel_event: 插件停止事件，置位时终止正在运行的 ffmpeg / ffprobe
+        """
+        self._cancel_event = cancel_event
+        self._runner = ProcessRunner(cancel_event)
+
     @staticmethod
-    def extract_wav_from_video(video_path, audio_path, audio_index=None):
+    def subtitle_output_args(subtitle_outputs):
         """
-        使用ffmpeg从视频文件中提取16000hz, 16-bit的wav格式音频
+        文本字幕输出参数，每条字幕流输出到单独的srt文件
+        :param subtitle_outputs: {字幕流序号: 输出路径}
         """
-        if not video_path or not audio_path:
-            return False
+        args = []
+        for subtitle_index, subtitle_path in (subtitle_outputs or {}).items():
+            args += ['-map', f'0:s:{subtitle_index}', '-vn', '-an', '-dn', '-f', 'srt', str(subtitle_path)]
+        return args
 
-        # 提取指定音频流
-        if audio_index:
-            command = ['ffmpeg', "-hide_banner", "-loglevel", "warning", '-y', '-i', video_path,
-                       '-map', f'0:a:{audio_index}',
-                       '-acodec', 'pcm_s16le', '-ac', '1', '-ar', '16000', audio_path]
-        else:
-            command = ['ffmpeg', "-hide_banner", "-loglevel", "warning", '-y', '-i', video_path,
-                       '-acodec', 'pcm_s16le', '-ac', '1', '-ar', '16000', audio_path]
+    def iter_pcm_from_video(self, video_path, audio_index=None, chunk_seconds=30, subtitle_outputs=None,
+                            duration=None):
+        """
+        使用ffmpeg从视频文件中解码16000hz单声道音频，通过管道按块读取，不落盘
+        :param video_path: 视频文件
+        :param audio_index: 音轨索引
+        :param chunk_seconds: 每块时长（秒）
+        :param subtitle_outputs: 同一次读取中一并提取的文本字幕 {字幕流序号: 输出路径}
+        :param duration: 媒体时长（秒），用于计算超时
+        :return: 生成器，每块为 int16 PCM 字节
+        """
+        if not video_path:
+            return
 
-        ret = subprocess.run(command).returncode
-        if ret == 0:
-            return True
-        return False
+        command = ['ffmpeg', "-hide_banner", "-loglevel", "warning", '-y', '-i', video_path]
+        command += Ffmpeg.subtitle_output_args(subtitle_outputs)
+        if audio_index is not None:
+            command += ['-map', f'0:a:{audio_index}']
+        command += ['-vn', '-sn', '-dn', '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', '16000', 'pipe:1']
 
-    @staticmethod
-    def get_video_metadata(video_path):
+        chunk_size = 16000 * 2 * chunk_seconds
+        with io_scheduler.slot(video_path, self._cancel_event):
+            result = yield from self._runner.stream(command, chunk_size, timeout=media_timeout(duration))
+        self.__log_result(result, "解码音频")
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg 解码音频失败，返回码 {result.returncode}"
+                               + (f"：\n{result.stderr}" if result.stderr else ""))
+
+    def read_pcm_from_video(self, video_path, audio_index=None, subtitle_outputs=None, duration=None):
+        """
+        使用ffmpeg从视频文件中解码16000hz单声道音频到内存，供faster-whisper直接使用
+        :param video_path: 视频文件
+        :param audio_index: 音轨索引
+        :param subtitle_outputs: 同一次读取中一并提取的文本字幕 {字幕流序号: 输出路径}
+        :param duration: 媒体时长（秒），用于计算超时
+        :return: float32 numpy 数组，失败返回None
+        """
+        import numpy as np
+
+        buffer = bytearray()
+        try:
+            for data in self.iter_pcm_from_video(video_path, audio_index, subtitle_outputs=subtitle_outputs,
+                                                 duration=duration):
+                buffer += data
+        except ProcessCancelled:
+            raise
+        except Exception as e:
+            logger.error(str(e))
+            return None
+        if not buffer:
+            return None
+        audio = np.frombuffer(buffer, dtype=np.int16).astype(np.float32) / 32768.0
+        return audio
+
+    def get_video_metadata(self, video_path):
         """
         获取视频元数据
         """
         if not video_path:
             return False
 
+        command = ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', video_path]
         try:
-            command = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', video_path]
-            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            if result.returncode == 0:
-                return json.loads(result.stdout.decode("utf-8"))
+            with io_scheduler.slot(video_path, self._cancel_event):
+                result = self._runner.run(command, timeout=PROBE_TIMEOUT, capture_stdout=True)
+        except ProcessCancelled:
+            raise
         except Exception as e:
-            print(e)
+            logger.error(f"读取视频元数据失败 {video_path}：{e}")
+            return None
+        logger.debug(f"{result.summary()}：{video_path}")
+        if result.returncode != 0:
+            logger.error(f"读取视频元数据失败 {video_path}，返回码 {result.returncode}"
+                         + (f"：\n{result.stderr}" if result.stderr else ""))
+            return None
+        try:
+            return json.loads(result.stdout.decode("utf-8"))
+        except ValueError as e:
+            logger.error(f"解析视频元数据失败 {video_path}：{e}")
         return None
 
-    @staticmethod
-    def extract_subtitle_from_video(video_path, subtitle_path, subtitle_index=None):
+    def extract_subtitle_from_video(self, video_path, subtitle_path, subtitle_index=None, duration=None):
         """
         从视频中提取字幕
         """
@@ -57,7 +125,39 @@ class Ffmpeg:
                        subtitle_path]
         else:
             command = ['ffmpeg', "-hide_banner", "-loglevel", "warning", '-y', '-i', video_path, subtitle_path]
-        ret = subprocess.run(command).returncode
-        if ret == 0:
-            return True
-        return False
+        return self.__run(video_path, command, media_timeout(duration), "提取字幕")
+
+    def extract_subtitles_from_video(self, video_path, subtitle_outputs, duration=None):
+        """
+        单次读取容器，提取多条文本字幕
+        :param video_path: 视频文件
+        :param subtitle_outputs: {字幕流序号: 输出srt路径}
+        :param duration: 媒体时长（秒），用于计算超时
+        """
+        if not video_path or not subtitle_outputs:
+            return False
+
+        command = ['ffmpeg', "-hide_banner", "-loglevel", "warning", '-y', '-i', video_path]
+        command += Ffmpeg.subtitle_output_args(subtitle_outputs)
+        return self.__run(video_path, command, media_timeout(duration), "提取字幕")
+
+    def __run(self, video_path, command, timeout, action) -> bool:
+        """
+        按视频所在设备排队运行 ffmpeg，失败时记录标准错误。任务停止时抛出 ProcessCancelled
+        """
+        try:
+            with io_scheduler.slot(video_path, self._cancel_event):
+                result = self._runner.run(command, timeout=timeout)
+        except ProcessTimeout as e:
+            logger.error(f"ffmpeg {action}超时：{e}")
+            return False
+        self.__log_result(result, action)
+        if result.returncode != 0:
+            logger.error(f"ffmpeg {action}失败，返回码 {result.returncode}"
+                         + (f"：\n{result.stderr}" if result.stderr else ""))
+            return False
+        return True
+
+    @staticmethod
+    def __log_result(result: ProcessResult, action: str):
+        logger.info(f"{action}：{result.summary()}")
@@ -0,0 +1,120 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+class ProbeCache:
+    """
+    ffprobe 元数据缓存，按 (路径, 大小, 修改时间) 索引，文件变化后自动失效。
+    网络挂载的媒体库只需 stat 即可判断是否命中，不必重新读取容器头
+    """
+
+    def __init__(self, db_file: Path):
+        db_file = Path(db_file)
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS probe ("
+                               "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, metadata BLOB, "
+                               "dev INTEGER, used REAL)")
+            # 旧版本的表没有设备号和使用时间
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(probe)")}
+            for column, column_type in (("dev", "INTEGER"), ("used", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE probe ADD COLUMN {column} {column_type}")
+            self._conn.execute("UPDATE probe SET used = ? WHERE used IS NULL", (time.time(),))
+        self._stats = {"hit": 0, "miss": 0, "invalidated": 0}
+
+    def get(self, path: str, stat: os.stat_result = None) -> Optional[dict]:
+        """
+        读取缓存，文件大小或修改时间变化时删除旧记录
+        """
+        stat = stat or os.stat(path)
+        with self._lock:
+            row = self._conn.execute("SELECT size, mtime_ns, metadata, used FROM probe WHERE path = ?",
+                                     (path,)).fetchone()
+            if row and (row[0], row[1]) == (stat.st_size, stat.st_mtime_ns):
+                self._stats["hit"] += 1
+                now = time.time()
+                # 使用时间只用于清理，每天最多更新一次，避免每次扫描都写库
+                if not row[3] or now - row[3] > 86400:
+                    with self._conn:
+                        self._conn.execute("UPDATE probe SET used = ? WHERE path = ?", (now, path))
+                return json.loads(zlib.decompress(row[2]))
+            self._stats["miss"] += 1
+            if row:
+                self._stats["invalidated"] += 1
+                with self._conn:
+                    self._conn.execute("DELETE FROM probe WHERE path = ?", (path,))
+        return None
+
+    def put(self, path: str, metadata: dict, stat: os.stat_result = None):
+        stat = stat or os.stat(path)
+        data = zlib.compress(json.dumps(metadata, ensure_ascii=False).encode("utf8"))
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO probe (path, size, mtime_ns, metadata, dev, used) "
+                               "VALUES (?, ?, ?, ?, ?, ?)",
+                               (path, stat.st_size, stat.st_mtime_ns, data, stat.st_dev, time.time()))
+
+    def probe(self, path: str, prober: Callable[[str], Optional[dict]]) -> Optional[dict]:
+        """
+        读取元数据，未命中时调用 prober 探测并写入缓存
+        """
+        stat = os.stat(path)
+        metadata = self.get(path, stat)
+        if metadata is None:
+            metadata = prober(path)
+            if metadata:
+                self.put(path, metadata, stat)
+        return metadata
+
+    def stats(self) -> Dict[str, float]:
+        """
+        命中统计（插件启动以来）
+        """
+        total = self._stats["hit"] + self._stats["miss"]
+        return dict(self._stats, total=total,
+                    hit_rate=round(self._stats["hit"] / total * 100, 1) if total else 0)
+
+    def prune(self, max_age_days: int = 180) -> int:
+        """
+        删除长期未使用的记录，以及所在存储仍可访问但文件已删除的记录
+        :return: 删除的记录数
+        """
+        expire = time.time() - max_age_days * 86400
+        with self._lock:
+            rows = self._conn.execute("SELECT path, dev, used FROM probe").fetchall()
+        stale = [(path,) for path, dev, used in rows if (used or 0) < expire or self.__removed(path, dev)]
+        if stale:
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM probe WHERE path = ?", stale)
+        return len(stale)
+
+    @staticmethod
+    def __removed(path: str, dev: Optional[int]) -> bool:
+        """
+        文件是否已被删除。网络存储离线或未挂载时文件同样不存在，此时向上找到的已有目录位于其他设备，不能视为删除
+        :param dev: 写入缓存时文件所在的设备号
+        """
+        if dev is None or os.path.exists(path):
+            return False
+        parent = os.path.dirname(path)
+        while not os.path.exists(parent):
+            if os.path.dirname(parent) == parent:
+                return False
+            parent = os.path.dirname(parent)
+        try:
+            return os.stat(parent).st_dev == dev
+        except OSError:
+            return False
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
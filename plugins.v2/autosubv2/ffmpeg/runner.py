@@ -0,0 +1,178 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+import psutil
+
+
+class ProcessCancelled(Exception):
+    """任务停止，进程已被终止"""
+    pass
+
+
+class ProcessTimeout(Exception):
+    """进程运行超时，已被终止"""
+    pass
+
+
+@dataclass
+class ProcessResult:
+    command: str
+    returncode: int
+    stdout: bytes
+    stderr: str
+    # 耗时（秒）
+    elapsed: float
+    # 进程读取的字节数（含网络挂载），定时采样，略低于实际值，无法获取时为0
+    bytes_read: int
+
+    def summary(self) -> str:
+        return f"{self.command} 耗时 {self.elapsed:.1f}s，读取 {self.bytes_read / 1024 / 1024:.1f}MB"
+
+
+def media_timeout(duration: Optional[float], factor: float = 0.5, minimum: float = 300) -> float:
+    """
+    按媒体时长计算超时：解码通常远快于实时，超过时长的 factor 倍仍未完成视为挂起
+    :param duration: 媒体时长（秒），未知时按3小时计
+    """
+    duration = duration if duration and duration > 0 else 3 * 3600
+    return minimum + duration * factor
+
+
+class _Job:
+    """
+    一次进程调用：后台线程收集标准错误、采样读取量，任务停止或超时时终止进程
+    """
+
+    def __init__(self, command: List[str], timeout: Optional[float], cancel_event: Optional[threading.Event],
+                 capture_stdout: bool):
+        self.name = command[0]
+        self.timeout = timeout
+        self.cancel_event = cancel_event
+        self.stderr = deque(maxlen=50)
+        self.bytes_read = 0
+        self.kill_reason = None
+        self.start = time.time()
+        self.process = subprocess.Popen(command, stdin=subprocess.DEVNULL,
+                                        stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+                                        stderr=subprocess.PIPE, start_new_session=True)
+        self._stderr_thread = threading.Thread(target=self.__drain_stderr, daemon=True)
+        self._stderr_thread.start()
+        threading.Thread(target=self.__watch, daemon=True).start()
+
+    def finish(self, stdout: bytes = b"") -> ProcessResult:
+        """
+        等待进程结束，被终止时抛出对应异常
+        """
+        if self.process.poll() is None:
+            self.process.wait()
+        self._stderr_thread.join(timeout=1)
+        stderr = "\n".join(self.stderr)
+        if self.kill_reason == "cancelled":
+            raise ProcessCancelled(f"{self.name} 已终止：任务已停止")
+        if self.kill_reason == "timeout":
+            raise ProcessTimeout(f"{self.name} 运行超过 {self.timeout:.0f}s，已终止" + (f"：\n{stderr}" if stderr else ""))
+        return ProcessResult(command=self.name, returncode=self.process.returncode, stdout=stdout, stderr=stderr,
+                             elapsed=time.time() - self.start, bytes_read=self.bytes_read)
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.__kill_group()
+            self.process.wait()
+
+    def __kill_group(self):
+        """
+        终止进程及其子进程，避免子进程继续占用输出管道
+        """
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except OSError:
+            self.process.kill()
+
+    def __watch(self):
+        try:
+            ps = psutil.Process(self.process.pid)
+        except psutil.Error:
+            ps = None
+        while self.process.poll() is None:
+            if ps:
+                self.__sample_io(ps)
+            if self.cancel_event and self.cancel_event.is_set():
+                self.kill_reason = "cancelled"
+            elif self.timeout and time.time() - self.start > self.timeout:
+                self.kill_reason = "timeout"
+            if self.kill_reason:
+                self.__kill_group()
+                break
+            time.sleep(0.2)
+
+    def __sample_io(self, ps: psutil.Process):
+        try:
+            counters = ps.io_counters()
+        except (psutil.Error, AttributeError, NotImplementedError):
+            return
+        # read_chars 包含网络文件系统的读取，read_bytes 仅统计块设备
+        self.bytes_read = max(self.bytes_read, getattr(counters, "read_chars", counters.read_bytes))
+
+    def __drain_stderr(self):
+        for line in iter(self.process.stderr.readline, b""):
+            line = line.decode("utf8", errors="replace").rstrip()
+            if line:
+                self.stderr.append(line)
+        self.process.stderr.close()
+
+
+class ProcessRunner:
+    """
+    ffmpeg / ffprobe 进程调用：支持超时和随插件停止事件终止，记录标准错误、耗时和读取量
+    """
+
+    def __init__(self, cancel_event: Optional[threading.Event] = None):
+        self._cancel_event = cancel_event
+
+    def run(self, command: List[str], timeout: Optional[float] = None, capture_stdout: bool = False) -> ProcessResult:
+        """
+        运行进程直到结束
+        :param command: 命令
+        :param timeout: 超时秒数，None 不限
+        :param capture_stdout: 是否读取标准输出
+        """
+        self.__check_cancelled(command)
+        job = _Job(command, timeout, self._cancel_event, capture_stdout)
+        stdout = b""
+        if capture_stdout:
+            try:
+                stdout = job.process.stdout.read()
+            finally:
+                job.process.stdout.close()
+        return job.finish(stdout)
+
+    def stream(self, command: List[str], chunk_size: int, timeout: Optional[float] = None) -> Iterator[bytes]:
+        """
+        运行进程并按块读取标准输出。调用方提前结束读取时终止进程
+        :return: 生成器，进程结束后返回 ProcessResult（StopIteration.value）
+        """
+        self.__check_cancelled(command)
+        job = _Job(command, timeout, self._cancel_event, True)
+        finished = False
+        try:
+            while True:
+                data = job.process.stdout.read(chunk_size)
+                if not data:
+                    break
+                yield data
+            finished = True
+        finally:
+            job.process.stdout.close()
+            if not finished:
+                job.kill()
+        return job.finish()
+
+    def __check_cancelled(self, command: List[str]):
+        if self._cancel_event and self._cancel_event.is_set():
+            raise ProcessCancelled(f"{command[0]} 未启动：任务已停止")
@@ -0,0 +1,138 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from plugins.autosubv2.ffmpeg.runner import ProcessCancelled
+
+
+def mount_point(path: str) -> str:
+    """
+    文件所在的挂载点
+    """
+    path = os.path.realpath(path)
+    if not os.path.isdir(path):
+        path = os.path.dirname(path)
+    while not os.path.ismount(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+class _Device:
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.waiting = 0
+        self.condition = threading.Condition()
+
+
+class IoScheduler:
+    """
+    按存储设备（st_dev）限制同时运行的 ffmpeg / ffprobe 数量。
+    多个进程同时读取同一块机械硬盘或同一个 NAS 共享时磁头来回寻道，总吞吐反而下降；SSD 则可承受更高并发。
+    不同设备之间互不影响，语音识别和翻译不经过调度
+    """
+
+    def __init__(self, default_limit: int = 2, readahead_mb: int = 16):
+        self._lock = threading.Lock()
+        self._devices: Dict[int, _Device] = {}
+        self._default_limit = default_limit
+        self._path_limits: Dict[int, int] = {}
+        self._readahead = readahead_mb * 1024 * 1024
+
+    def configure(self, default_limit: int, path_limits: Dict[str, int] = None, readahead_mb: int = 16):
+        """
+        设置并发限制，对正在排队的任务立即生效
+        :param default_limit: 每个设备默认并发数
+        :param path_limits: {路径: 并发数}，按路径所在设备设置
+        :param readahead_mb: 任务开始前提示内核预读文件头部的大小（MB），0为不预读
+        """
+        limits = {}
+        for path, limit in (path_limits or {}).items():
+            try:
+                limits[os.stat(path).st_dev] = max(1, int(limit))
+            except (OSError, ValueError):
+                continue
+        with self._lock:
+            self._default_limit = max(1, int(default_limit))
+            self._path_limits = limits
+            self._readahead = max(0, int(readahead_mb)) * 1024 * 1024
+            devices = list(self._devices.items())
+        for dev, device in devices:
+            with device.condition:
+                device.limit = limits.get(dev, self._default_limit)
+                device.condition.notify_all()
+
+    @contextmanager
+    def slot(self, path: str, cancel_event: Optional[threading.Event] = None):
+        """
+        占用文件所在设备的一个并发名额，名额已满时等待
+        :param path: 媒体文件
+        :param cancel_event: 插件停止事件，置位时放弃等待并抛出 ProcessCancelled
+        """
+        try:
+            dev = os.stat(path).st_dev
+        except OSError:
+            # 文件无法访问时不调度，由 ffmpeg 报告错误
+            yield
+            return
+        device = self.__device(dev, path)
+        with device.condition:
+            device.waiting += 1
+            try:
+                while device.active >= device.limit:
+                    if cancel_event and cancel_event.is_set():
+                        raise ProcessCancelled(f"等待设备 {device.name} 时任务已停止")
+                    device.condition.wait(timeout=1)
+            finally:
+                device.waiting -= 1
+            device.active += 1
+        try:
+            self.__readahead(path)
+            yield
+        finally:
+            with device.condition:
+                device.active -= 1
+                device.condition.notify()
+
+    def stats(self) -> List[dict]:
+        """
+        各设备的并发限制、运行中和排队中的任务数
+        """
+        with self._lock:
+            devices = list(self._devices.values())
+        return [{"device": device.name, "limit": device.limit, "active": device.active, "waiting": device.waiting}
+                for device in devices]
+
+    def __device(self, dev: int, path: str) -> _Device:
+        with self._lock:
+            device = self._devices.get(dev)
+            if not device:
+                device = self._devices[dev] = _Device(mount_point(path),
+                                                      self._path_limits.get(dev, self._default_limit))
+            return device
+
+    def __readahead(self, path: str):
+        """
+        提示内核预读文件头部（容器索引、首个数据块），页缓存在进程间共享，ffmpeg 启动后直接命中
+        """
+        if not self._readahead or not hasattr(os, "posix_fadvise"):
+            return
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.posix_fadvise(fd, 0, self._readahead, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+io_scheduler = IoScheduler()
@@ -0,0 +1,139 @@
+import math
+import re
+import threading
+from typing import Dict, List, Tuple
+
+# 单批最多行数
+MAX_LINES = 60
+# 预算上下限（估算token）
+MIN_BUDGET = 150
+MAX_BUDGET = 6000
+# 初始预算，Ollama 默认上下文长度为2048，需容纳提示词和译文
+DEFAULT_BUDGET = {"ollama": 800, "openai": 1500}
+# 单次请求耗时超过该值时缩小批次（秒），Ollama 请求超时为60秒
+TARGET_LATENCY = 30
+# 批次前后相邻上下文的 token 上限占预算的比例
+CONTEXT_SHARE = 0.5
+
+_CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算 token 数：中日韩字符约1个，其他文字约4个字符1个，每行另计1个
+    """
+    cjk = len(_CJK.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4) + 1
+
+
+def context_bounds(texts: List[str], first: int, last: int, context_window: int, limit: int) -> Tuple[int, int]:
+    """
+    批次前后的上下文范围：前后交替逐行向外扩展，最多 context_window 行，总量超过 limit 时停止，靠近批次的行优先
+    :param first: 批次第一行
+    :param last: 批次最后一行
+    :return: (起始行, 结束行)，包含批次本身
+    """
+    start, end = first, last
+    used = 0
+    for _ in range(context_window):
+        grown = False
+        if start > 0 and used + estimate_tokens(texts[start - 1]) <= limit:
+            start -= 1
+            used += estimate_tokens(texts[start])
+            grown = True
+        if end < len(texts) - 1 and used + estimate_tokens(texts[end + 1]) <= limit:
+            end += 1
+            used += estimate_tokens(texts[end])
+            grown = True
+        if not grown:
+            break
+    return start, end
+
+
+class AdaptiveBatcher:
+    """
+    按 token 预算划分翻译批次。预算包括待译文本及其在上下文中的重复，前后相邻的上下文另按 context_limit 截断，
+    长句附近也不会因上下文挤占预算而退化为单行批次。
+    按翻译器和模型分别记录，根据行数不匹配和请求耗时调整：不匹配或超时时缩小，顺利时逐步放大
+    """
+
+    def __init__(self, state: Dict[str, dict] = None):
+        self._state = state if state is not None else {}
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> Dict[str, dict]:
+        return self._state
+
+    def budget(self, scope: str) -> int:
+        """
+        当前预算
+        :param scope: 翻译器和模型，如 openai:gpt-4o-mini
+        """
+        with self._lock:
+            return int(self._state.get(scope, {}).get("budget", self.__default_budget(scope)))
+
+    def context_limit(self, scope: str) -> int:
+        """
+        批次前后相邻上下文的 token 上限，见 context_bounds
+        """
+        return int(self.budget(scope) * CONTEXT_SHARE)
+
+    def plan(self, scope: str, texts: List[str], indices: List[int], context_window: int) -> List[List[int]]:
+        """
+        划分批次
+        :param scope: 翻译器和模型
+        :param texts: 全部原文
+        :param indices: 待翻译的行
+        :param context_window: 上下文窗口行数
+        :return: 批次，每批为行序号列表
+        """
+        budget = self.budget(scope)
+        tokens = [estimate_tokens(text) for text in texts]
+
+        def context_cost(first: int, last: int) -> int:
+            # 批次本身（含其间已由翻译记忆命中的行）在上下文中再出现一次，前后相邻的上下文另行截断，不计入预算
+            return sum(tokens[first:last + 1]) if context_window > 0 else 0
+
+        batches = []
+        batch = []
+        cost = 0
+        for idx in indices:
+            if batch:
+                new_cost = cost + tokens[idx]
+                if len(batch) >= MAX_LINES or new_cost + context_cost(batch[0], idx) > budget:
+                    batches.append(batch)
+                    batch, cost = [], 0
+            batch.append(idx)
+            cost += tokens[idx]
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def record(self, scope: str, tokens: int, latency: float, mismatched: bool = False, failed: bool = False):
+        """
+        记录一次批量请求的结果并调整预算
+        :param tokens: 本批估算 token 数，与 plan 的计算方式一致，不含前后相邻的上下文
+        :param latency: 请求耗时（秒）
+        :param mismatched: 返回行数不匹配
+        :param failed: 请求失败（超时、接口错误）
+        """
+        with self._lock:
+            stats = self._state.setdefault(scope, {"budget": self.__default_budget(scope), "requests": 0,
+                                                   "mismatch_rate": 0.0, "latency": 0.0})
+            budget = stats["budget"]
+            stats["requests"] += 1
+            stats["mismatch_rate"] = round(stats["mismatch_rate"] * 0.9 + (0.1 if mismatched else 0), 4)
+            stats["latency"] = round(stats["latency"] * 0.8 + latency * 0.2, 2) if stats["requests"] > 1 \
+                else round(latency, 2)
+            if mismatched or failed or latency > TARGET_LATENCY:
+                # 只有接近预算的批次才能说明预算过大
+                if tokens >= budget * 0.5:
+                    budget = budget * 0.7
+            elif tokens >= budget * 0.8 and stats["mismatch_rate"] < 0.1:
+                budget = budget * 1.1
+            stats["budget"] = int(min(MAX_BUDGET, max(MIN_BUDGET, budget)))
+
+    @staticmethod
+    def __default_budget(scope: str) -> int:
+        return DEFAULT_BUDGET.get(scope.split(":")[0], 800)
@@ -0,0 +1,93 @@
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+
+def normalize(text: str) -> str:
+    """
+    归一化原文：全半角统一、合并空白和换行。保留大小写，避免专有名词与普通词混淆
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class TranslationMemory:
+    """
+    持久化的逐行翻译记忆，在不同文件和剧集之间共享。
+    按 (归一化原文, 原文语言, 翻译器模型, 提示词版本) 索引，命中的行不再请求大模型
+    """
+
+    def __init__(self, db_file: Path, max_entries: int = 200000):
+        db_file = Path(db_file)
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS memory ("
+                               "source TEXT, lang TEXT, model TEXT, prompt TEXT, translation TEXT, "
+                               "hits INTEGER DEFAULT 0, used REAL, "
+                               "PRIMARY KEY (source, lang, model, prompt))")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS memory_used ON memory (used)")
+
+    def lookup(self, texts: Iterable[str], lang: str, model: str, prompt: str) -> Dict[int, str]:
+        """
+        批量查询
+        :param texts: 原文
+        :return: {原文序号: 译文}
+        """
+        found = {}
+        hit_keys = []
+        with self._lock:
+            for index, text in enumerate(texts):
+                source = normalize(text)
+                if not source:
+                    continue
+                row = self._conn.execute("SELECT translation FROM memory "
+                                         "WHERE source = ? AND lang = ? AND model = ? AND prompt = ?",
+                                         (source, lang, model, prompt)).fetchone()
+                if row:
+                    found[index] = row[0]
+                    hit_keys.append((time.time(), source, lang, model, prompt))
+            if hit_keys:
+                with self._conn:
+                    self._conn.executemany("UPDATE memory SET hits = hits + 1, used = ? "
+                                           "WHERE source = ? AND lang = ? AND model = ? AND prompt = ?", hit_keys)
+        return found
+
+    def store(self, pairs: Iterable[Tuple[str, str]], lang: str, model: str, prompt: str):
+        """
+        保存译文
+        :param pairs: (原文, 译文)
+        """
+        now = time.time()
+        rows = [(normalize(text), lang, model, prompt, translation.strip(), now)
+                for text, translation in pairs if normalize(text) and translation and translation.strip()]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO memory (source, lang, model, prompt, translation, used) "
+                                   "VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def prune(self, max_age_days: int = 180) -> int:
+        """
+        删除长期未使用的记录，超过最大条数时删除最久未使用的记录
+        :return: 删除的记录数
+        """
+        with self._lock, self._conn:
+            count = self._conn.execute("DELETE FROM memory WHERE used < ?",
+                                       (time.time() - max_age_days * 86400,)).rowcount
+            total = self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+            if total > self._max_entries:
+                count += self._conn.execute("DELETE FROM memory WHERE rowid IN "
+                                            "(SELECT rowid FROM memory ORDER BY used LIMIT ?)",
+                                            (total - self._max_entries,)).rowcount
+        return count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
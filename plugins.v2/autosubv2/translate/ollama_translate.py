@@ -8,12 +8,18 @@ from app.log import logger
 class Ollama:
     _api_url: str = "http://localhost:11434"
     _model: str = "llama3"
+    # 修改翻译提示词时递增，翻译记忆按版本区分
+    prompt_version: str = "2"
 
     def __init__(self, api_url: str = None, model: str = None):
         self._api_url = api_url.rstrip('/') if api_url else "http://localhost:11434"
         self._model = model if model else "llama3"
         logger.info(f"Ollama翻译器初始化：API URL={self._api_url}, 模型={self._model}")
 
+    @property
+    def model(self) -> str:
+        return self._model
+
     def __get_model(self, messages: List[dict], user: str = "MoviePilot", **kwargs):
         """
         与 Ollama 的 /api/generate 接口进行交互。
@@ -68,11 +74,12 @@ class Ollama:
 
         return response.json()
 
-    def translate_to_zh(self, text: str, context: str = None) -> (bool, str):
+    def translate_to_zh(self, text: str, context: str = None, instruction: str = None) -> (bool, str):
         """
         翻译为中文
         :param text: 输入文本
         :param context: 翻译上下文
+        :param instruction: 附加规则，如批量翻译的输出格式
         :return: (是否成功, 翻译结果或错误信息)
         """
         system_prompt = """您是一位专业字幕翻译专家，请严格遵循以下规则：
@@ -81,6 +88,8 @@ class Ollama:
 3. 结合上下文语境，人物称谓、专业术语、情感语气在上下文保持连贯
 4. 按行翻译待译内容。翻译结果不要包括上下文。
 5. 输出内容必须仅包括译文。不要输出任何开场白，解释说明或总结"""
+        if instruction:
+            system_prompt += f"\n6. {instruction}"
         
         user_prompt = f"翻译上下文：\n{context}\n\n需要翻译的内容：\n{text}" if context else f"请翻译：\n{text}"
         
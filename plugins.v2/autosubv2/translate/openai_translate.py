@@ -11,6 +11,8 @@ class OpenAi:
     _api_key: str = None
     _api_url: str = None
     _model: str = "gpt-3.5-turbo"
+    # 修改翻译提示词时递增，翻译记忆按版本区分
+    prompt_version: str = "2"
 
     def __init__(self, api_key: str = None, api_url: str = None, proxy: dict = None, model: str = None,
                  compatible: bool = False):
@@ -23,6 +25,10 @@ class OpenAi:
         if model:
             self._model = model
 
+    @property
+    def model(self) -> str:
+        return self._model
+
     @staticmethod
     def __save_session(session_id: str, message: str):
         """
@@ -108,11 +114,12 @@ class OpenAi:
         if OpenAISessionCache.get(session_id):
             OpenAISessionCache.delete(session_id)
 
-    def translate_to_zh(self, text: str, context: str = None):
+    def translate_to_zh(self, text: str, context: str = None, instruction: str = None):
         """
         翻译为中文
         :param text: 输入文本
         :param context: 翻译上下文
+        :param instruction: 附加规则，如批量翻译的输出格式
         """
         system_prompt = """您是一位专业字幕翻译专家，请严格遵循以下规则：
 1. 将原文精准翻译为简体中文，保持原文本意
@@ -120,6 +127,8 @@ class OpenAi:
 3. 结合上下文语境，人物称谓、专业术语、情感语气在上下文中保持连贯
 4. 按行翻译待译内容。翻译结果不要包括上下文。
 5. 输出内容必须仅包括译文。不要输出任何开场白，解释说明或总结"""
+        if instruction:
+            system_prompt += f"\n6. {instruction}"
         user_prompt = f"翻译上下文：\n{context}\n\n需要翻译的内容：\n{text}" if context else f"请翻译：\n{text}"
         result = ""
         try:
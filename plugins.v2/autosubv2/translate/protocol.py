@@ -0,0 +1,128 @@
+import json
+import re
+from typing import Dict, List, Optional
+
+PLAIN = "plain"
+NUMBERED = "numbered"
+JSON = "json"
+
+# 行首编号：1. / 1: / [1] / 【1】 / (1) / 1、，编号前后允许空白和 markdown 强调符号
+_NUMBERED_LINE = re.compile(r"^\s*[*_`]*\s*[\[【(（]?\s*(\d{1,4})\s*[\]】)）.:：、]\s*[*_`]*\s*(.*)$")
+
+# ```json 代码块
+_FENCED_BLOCK = re.compile(r"```[a-zA-Z]*[ \t]*\n(.*?)```", re.S)
+
+_INSTRUCTIONS = {
+    NUMBERED: "待译内容每行以 [编号] 开头。逐行翻译，每行输出一行，保留原编号，格式为 [编号] 译文，不要合并或拆分行",
+    JSON: '待译内容为 JSON 数组，每项包含 id 和 text。输出同样格式的 JSON 数组，id 保持不变，text 为译文，'
+          '不要合并或拆分条目，不要输出 JSON 以外的内容',
+}
+
+
+def instruction(protocol: str) -> Optional[str]:
+    """
+    协议对应的附加提示词，纯文本协议无需附加
+    """
+    return _INSTRUCTIONS.get(protocol)
+
+
+def encode(lines: List[str], protocol: str) -> str:
+    """
+    生成批量翻译请求文本
+    :param lines: 待译原文
+    :param protocol: plain / numbered / json
+    """
+    if protocol == PLAIN:
+        return "\n".join(lines)
+    # 单条字幕内的换行合并为空格，保证一条字幕对应一行
+    lines = [re.sub(r"\s*\n\s*", " ", line).strip() for line in lines]
+    if protocol == JSON:
+        return json.dumps([{"id": i + 1, "text": line} for i, line in enumerate(lines)], ensure_ascii=False)
+    return "\n".join(f"[{i + 1}] {line}" for i, line in enumerate(lines))
+
+
+def decode(reply: str, count: int, protocol: str) -> Dict[int, str]:
+    """
+    解析批量翻译结果
+    :param reply: 大模型回复
+    :param count: 请求的行数
+    :param protocol: plain / numbered / json
+    :return: {行位置(从0开始): 译文}，只包含能对齐的行
+    """
+    if protocol == PLAIN:
+        lines = [line.strip() for line in reply.split("\n") if line.strip()]
+        return dict(enumerate(lines)) if len(lines) == count else {}
+    if protocol == JSON:
+        result = _decode_json(reply, count)
+        if result is not None:
+            return result
+    # JSON 解析失败时按编号行解析，模型常会改为输出编号列表
+    return _decode_numbered(reply, count)
+
+
+def _extract_json_list(reply: str) -> Optional[list]:
+    """
+    从回复中取出译文数组：优先使用代码块，再从每个 [ 处尝试解析，开场白中的 [JSON] 之类会被跳过
+    """
+    decoder = json.JSONDecoder()
+    for text in [match.group(1) for match in _FENCED_BLOCK.finditer(reply)] + [reply]:
+        start = text.find("[")
+        while start >= 0:
+            try:
+                items, _ = decoder.raw_decode(text, start)
+            except ValueError:
+                items = None
+            # 编号 [1] 等也能解析为数组，只接受由对象或字符串组成的数组
+            if isinstance(items, list) and items and all(isinstance(item, (dict, str)) for item in items):
+                return items
+            start = text.find("[", start + 1)
+    return None
+
+
+def _decode_json(reply: str, count: int) -> Optional[Dict[int, str]]:
+    items = _extract_json_list(reply)
+    if items is None:
+        return None
+    result = {}
+    if all(isinstance(item, str) for item in items):
+        # 只返回译文数组时，仅在条数一致时按顺序对齐
+        if len(items) != count:
+            return {}
+        return {i: item.strip() for i, item in enumerate(items) if item.strip()}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            position = int(item.get("id")) - 1
+        except (TypeError, ValueError):
+            continue
+        text = str(item.get("text") or "").strip()
+        if 0 <= position < count and text and position not in result:
+            result[position] = text
+    return result
+
+
+def _decode_numbered(reply: str, count: int) -> Dict[int, str]:
+    result = {}
+    current = None
+    continuation = []
+    for line in reply.split("\n"):
+        if not line.strip():
+            continue
+        match = _NUMBERED_LINE.match(line)
+        if not match:
+            # 开场白忽略；两个编号之间的无编号行视为上一条译文的折行，最后一条之后的内容多为说明，丢弃
+            if current is not None:
+                continuation.append(line.strip())
+            continue
+        if current is not None and continuation:
+            result[current] = " ".join([result[current]] + continuation).strip()
+        continuation = []
+        position = int(match.group(1)) - 1
+        if 0 <= position < count and position not in result:
+            current = position
+            result[position] = match.group(2).strip()
+        else:
+            # 超出范围或重复的编号不可信
+            current = None
+    return {position: text for position, text in result.items() if text}
@@ -0,0 +1,137 @@
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+
+_asr_dir = Path(__file__).parent.parent / "plugins.v2" / "autosubv2" / "asr"
+# 与识别进程相同，注册 plugins.autosubv2 包路径但不执行插件主模块
+_spec = importlib.util.spec_from_file_location("worker_process", _asr_dir / "worker_process.py")
+_worker_process = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_worker_process)
+_worker_process._bootstrap()
+
+from plugins.autosubv2.asr import chunked  # noqa: E402
+from plugins.autosubv2.asr.checkpoint import TranscriptCheckpoint, shift_segments  # noqa: E402
+
+TimedSegment, TimedWord = chunked.TimedSegment, chunked.TimedWord
+
+
+def _segment(words):
+    return TimedSegment(words[0][0], words[-1][1], "".join(w[2] for w in words),
+                        [TimedWord(*w) for w in words])
+
+
+def test_stitch_trims_overlap_from_text():
+    first = [_segment([(0.0, 1.0, " I"), (1.0, 2.0, " told"), (2.0, 3.0, " you")])]
+    second = [_segment([(2.0, 3.0, " you"), (3.0, 4.0, " so")])]
+    stitched = chunked._stitch([first, second])
+    assert [s.text for s in stitched] == [" I told you", " so"]
+    assert stitched[1].start == 3.0
+
+
+def test_stitch_without_words_drops_mostly_overlapping_segment():
+    first = [TimedSegment(0.0, 3.0, "I told you", [])]
+    second = [TimedSegment(2.0, 3.5, "you", []), TimedSegment(2.8, 6.0, "so what", [])]
+    stitched = chunked._stitch([first, second])
+    assert [s.text for s in stitched] == ["I told you", "so what"]
+    assert stitched[1].start == 3.0
+
+
+class _Info:
+    language = "ja"
+    language_probability = 0.99
+
+
+class _FakeModel:
+    """
+    每10秒输出一段，文本为该段起点在整段音频中的秒数（由音频采样值编码），并记录转录过的音频时长
+    """
+
+    def __init__(self):
+        self.transcribed = 0.0
+
+    def transcribe(self, audio, language=None, **kwargs):
+        self.transcribed += len(audio) / chunked.SAMPLE_RATE
+
+        def segments():
+            for start in range(0, int(len(audio) / chunked.SAMPLE_RATE) - 5, 10):
+                second = int(round(audio[start * chunked.SAMPLE_RATE] * 10000))
+                yield TimedSegment(float(start), float(start + 5), str(second), [])
+
+        return segments(), _Info()
+
+
+def _run(model, audio, checkpoint_file, stop_after=None):
+    """
+    按 __transcribe 的方式转录并逐段写入断点，stop_after 段后模拟中断
+    """
+    checkpoint = TranscriptCheckpoint(checkpoint_file).load()
+    offset = checkpoint.resume_at
+    segments, _ = chunked.transcribe_chunked(model, audio[int(offset * chunked.SAMPLE_RATE):], language=None,
+                                             workers=2, should_stop=lambda: False)
+    checkpoint.start("ja")
+    try:
+        for count, segment in enumerate(shift_segments(segments, offset)):
+            if stop_after is not None and count >= stop_after:
+                return
+            checkpoint.append(segment)
+    finally:
+        segments.close()
+        checkpoint.close()
+    return checkpoint.segments
+
+
+def test_chunked_run_resumes_from_checkpoint(tmp_path):
+    duration = 1500
+    # 采样值编码所在秒数，便于检查结果的时间轴
+    audio = (np.arange(duration * chunked.SAMPLE_RATE) // chunked.SAMPLE_RATE).astype(np.float32) / 10000
+    checkpoint_file = tmp_path / "checkpoint.jsonl"
+
+    interrupted = _FakeModel()
+    assert _run(interrupted, audio, checkpoint_file, stop_after=45) is None
+    saved = TranscriptCheckpoint(checkpoint_file).load()
+    assert len(saved.segments) == 45
+
+    resumed = _FakeModel()
+    segments = _run(resumed, audio, checkpoint_file)
+    # 只转录断点之后的音频
+    assert resumed.transcribed == duration - int(saved.resume_at)
+    starts = [segment.start for segment in segments]
+    assert starts == sorted(set(starts))
+    # 文本与时间轴一致：每段文本为该段在原始音频中的起始秒数
+    assert all(abs(float(segment.text) - segment.start) < 1 for segment in segments)
+    assert segments[:45] == saved.segments
+    assert segments[-1].end > duration - 15
+
+
+def test_chunked_yields_before_later_chunks_finish():
+    import threading
+
+    release = threading.Event()
+
+    class _SlowModel(_FakeModel):
+        def transcribe(self, audio, language=None, **kwargs):
+            segments, info = super().transcribe(audio, language, **kwargs)
+            if language is None:
+                return segments, info
+
+            def slow():
+                # 首段之后的段等待放行，未放行前首段的结果应已可读取
+                release.wait(timeout=10)
+                yield from segments
+
+            return slow(), info
+
+    audio = np.zeros(1500 * chunked.SAMPLE_RATE, dtype=np.float32)
+    segments, _ = chunked.transcribe_chunked(_SlowModel(), audio, language=None, workers=2,
+                                             should_stop=lambda: False)
+    received = []
+    reader = threading.Thread(target=lambda: received.append(next(segments)), daemon=True)
+    reader.start()
+    reader.join(timeout=3)
+    first_ready = bool(received)
+    release.set()
+    reader.join()
+    rest = list(segments)
+    assert first_ready
+    assert received[0].start == 0.0 and rest
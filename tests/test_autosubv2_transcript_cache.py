@@ -0,0 +1,37 @@
+import importlib.util
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import srt
+
+_spec = importlib.util.spec_from_file_location(
+    "transcript_cache", Path(__file__).parent.parent / "plugins.v2" / "autosubv2" / "asr" / "transcript_cache.py")
+transcript_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(transcript_cache)
+
+
+def _audio(seconds: int, seed: int) -> np.ndarray:
+    # 每秒音量随机变化，模拟同一音轨的音乐和音效
+    rng = np.random.default_rng(seed)
+    envelope = np.repeat(rng.uniform(0.01, 0.5, seconds), transcript_cache.SAMPLE_RATE)
+    return (envelope * rng.standard_normal(len(envelope))).astype(np.float32)
+
+
+def _subs(text: str):
+    return [srt.Subtitle(index=1, start=timedelta(seconds=1), end=timedelta(seconds=2), content=text)]
+
+
+def test_matching_envelope_in_other_language_is_not_reused(tmp_path):
+    cache = transcript_cache.TranscriptCache(tmp_path)
+    original = transcript_cache.fingerprint(_audio(120, seed=1))
+    cache.store(original, "large-v3", "balanced", "ja", _subs("こんにちは"))
+
+    # 配音版：音乐音效相同，能量包络几乎一致
+    dubbed = transcript_cache.fingerprint(_audio(120, seed=1) * 0.9)
+    assert cache.lookup(dubbed, ["large-v3"], "balanced", "en") is None
+    assert cache.lookup(dubbed, ["large-v3"], "balanced", "auto") is None
+    assert cache.lookup(dubbed, ["large-v3"], "balanced", None) is None
+
+    lang, subs, entry, offset = cache.lookup(dubbed, ["large-v3"], "balanced", "ja")
+    assert lang == "ja" and subs[0].content == "こんにちは" and entry["score"] >= 0.9